@@ -120,8 +120,9 @@ def run_batch_processing(input_csv: str, structure_dirs: list, start_idx: int, e
     
     # Save batch results to Modal volume
     batch_results = process_submissions_batch(input_csv, structure_dirs, start_idx, end_idx, save_path, data_path)
-    batch_output_path = os.path.join(save_path, "results", f"batch_{start_idx}_{end_idx}.csv")
-    pd.DataFrame(batch_results).to_csv(batch_output_path, index=False)
+    # Parquet+zstd is much faster to write/read back than CSV and keeps dtypes
+    batch_output_path = os.path.join(save_path, "results", f"batch_{start_idx}_{end_idx}.parquet")
+    pd.DataFrame(batch_results).to_parquet(batch_output_path, compression='zstd', compression_level=3)
     logger.info(f"Saved batch results to {batch_output_path}")
     
     return batch_output_path  # Return the path instead of the results
@@ -139,26 +140,27 @@ def main():
         
         logger.info(f"Found {total_submissions} total submissions")
         
-        # Process batches and collect paths
-        batch_paths = []
-        total_batches = (total_submissions + batch_size - 1) // batch_size
-        
-        with tqdm(total=total_batches, desc="Processing batches") as batch_pbar:
-            for start_idx in range(0, total_submissions, batch_size):
-                end_idx = min(start_idx + batch_size, total_submissions)
-                logger.info(f"Processing batch {start_idx}-{end_idx}")
-                
-                # Run batch processing and collect the path
-                batch_path = run_batch_processing.remote(
-                    input_csv="all_submissions.csv",
-                    structure_dirs=['001_2024', '002_2024'],
-                    start_idx=start_idx,
-                    end_idx=end_idx,
-                    save_path="/root/competition_output",
-                    data_path="/root/competition_data"
-                )
-                batch_paths.append(batch_path)
-                batch_pbar.update(1)
+        # Fan all batches out at once; Modal parallelizes dispatch and
+        # container startup instead of blocking on each future in turn
+        batch_args = [
+            (
+                "all_submissions.csv",
+                ['001_2024', '002_2024'],
+                start_idx,
+                min(start_idx + batch_size, total_submissions),
+                "/root/competition_output",
+                "/root/competition_data",
+            )
+            for start_idx in range(0, total_submissions, batch_size)
+        ]
+        logger.info(f"Dispatching {len(batch_args)} batches")
+        batch_paths = list(
+            tqdm(
+                run_batch_processing.starmap(batch_args),
+                total=len(batch_args),
+                desc="Processing batches",
+            )
+        )
         
         # Create a new Modal function to combine results
         @app.function(
@@ -168,17 +170,17 @@ def main():
             all_results = []
             for path in batch_paths:
                 try:
-                    batch_df = pd.read_csv(path)
+                    batch_df = pd.read_parquet(path)
                     all_results.append(batch_df)
                 except Exception as e:
                     logger.error(f"Error reading batch results from {path}: {str(e)}")
-            
+
             if not all_results:
                 raise RuntimeError("No results were successfully processed")
-                
+
             final_results = pd.concat(all_results, ignore_index=True)
-            output_path = "/root/competition_output/results/final_results.csv"
-            final_results.to_csv(output_path, index=False)
+            output_path = "/root/competition_output/results/final_results.parquet"
+            final_results.to_parquet(output_path, compression='zstd', compression_level=3)
             return output_path
         
         # Combine results inside Modal
@@ -1,33 +1,64 @@
+import numpy as np
 import pandas as pd
-import ast
-import glob
+import fnmatch
+import orjson
+import pyarrow.dataset as ds
 
 from loguru import logger
 import os
 import shutil
 
 
+def read_table(csv_path, columns=None, **read_csv_kwargs):
+    """Read a CSV through a sibling Parquet cache.
+
+    The CSV is converted to ``.parquet`` on first use (or when the CSV is newer
+    than the cache); subsequent reads take the binary columnar path with column
+    projection instead of re-parsing the CSV.
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        # PyArrow's CSV reader parses in parallel across cores
+        pd.read_csv(csv_path, engine='pyarrow', **read_csv_kwargs).to_parquet(
+            parquet_path, compression='zstd', compression_level=3
+        )
+    return pd.read_parquet(parquet_path, columns=columns)
+
+
+def merge_on_sequence(left, right, **merge_kwargs):
+    """Merge two frames on 'sequence' via factorized integer keys.
+
+    Hashing short int codes instead of 100+ character strings keeps the join
+    cost proportional to row count rather than sequence length.
+    """
+    codes, _ = pd.factorize(
+        pd.concat([left['sequence'], right['sequence']], ignore_index=True)
+    )
+    left = left.assign(_seq_key=codes[:len(left)])
+    right = right.assign(_seq_key=codes[len(left):]).drop(columns=['sequence'])
+    return pd.merge(left, right, on='_seq_key', **merge_kwargs).drop(columns=['_seq_key'])
+
+
 # Round 1: submissions file and affinity file
 round_1_path = "./data/round_1/submissions/submissions_annotated.csv"
 round_1_affinity = './data/round_1/data_package/result_summary.csv'
-submissions_round_1 = pd.read_csv(round_1_path).drop_duplicates(subset='sequence')
+submissions_round_1 = read_table(round_1_path).drop_duplicates(subset='sequence')
 submissions_round_1 = submissions_round_1.rename(columns={'model_names': 'model_category', 'category': 'design_category'})
-affinity_round_1 = pd.read_csv(round_1_affinity)
-affinity_round_1_missing_columns = pd.read_csv('./data/round_1/data_package/result_summary_missing_columns.csv')
+affinity_round_1 = read_table(round_1_affinity)
+affinity_round_1_missing_columns = read_table('./data/round_1/data_package/result_summary_missing_columns.csv')
 affinity_round_1 = pd.merge(affinity_round_1, affinity_round_1_missing_columns, on = 'name', how = 'left')
 
 
-remaining_metrics = pd.read_csv('./data/round_1/data_package/remaining_metrics.csv')
+remaining_metrics = read_table('./data/round_1/data_package/remaining_metrics.csv')
 remaining_metrics = remaining_metrics.rename(columns={'name': 'id'})
 
-remaining_pll = pd.read_csv('./data/round_1/data_package/remaining_pll.csv')[['id', 'esm_pll']]
+remaining_pll = read_table('./data/round_1/data_package/remaining_pll.csv', columns=['id', 'esm_pll'])
 remaining_metrics = pd.merge(remaining_metrics, remaining_pll, on='id', how='left')
 
 # Merge round 1 submissions with affinity data
-submissions_round_1 = pd.merge(
+submissions_round_1 = merge_on_sequence(
     submissions_round_1,
     affinity_round_1,
-    on='sequence',
     how='left'
 )
 
@@ -35,48 +66,66 @@ submissions_round_1 = pd.merge(
 # Round 2: submissions file and affinity file
 round_2_path = "./data/round_2/submissions/submissions_annotated.csv"
 round_2_affinity = './data/round_2/data_package/result_summary.csv'
-submissions_round_2 = pd.read_csv(round_2_path).drop_duplicates(subset='sequence')
+submissions_round_2 = read_table(round_2_path).drop_duplicates(subset='sequence')
 submissions_round_2 = submissions_round_2.rename(columns={'main_model_category': 'model_category', 'category': 'design_category'})
-affinity_round_2 = pd.read_csv(round_2_affinity)
-submissions_round_2 = pd.merge(
+affinity_round_2 = read_table(round_2_affinity)
+submissions_round_2 = merge_on_sequence(
     submissions_round_2,
     affinity_round_2,
-    on='sequence',
     how='left'
 )
 submissions_round_2 = submissions_round_2.rename(columns = {'username_x': 'username'})
 
 # Pooled submissions with ids
-submissions_pooled = pd.read_csv('./data/raw/submissions/submissions_annotated.csv')
-# Create a mapping of sequence to id from submissions_pooled
-sequence_to_id = submissions_pooled.set_index('sequence')['id'].to_dict()
+submissions_pooled = read_table('./data/raw/submissions/submissions_annotated.csv')
+# Map ids through the indexed Series directly; pandas hashes it internally
+# without materializing a Python dict of every sequence/id pair
+sequence_to_id = submissions_pooled.set_index('sequence')['id']
 
 # Update ids in submissions_round_1 based on sequence matches
 submissions_round_1['id'] = submissions_round_1['sequence'].map(sequence_to_id)
 submissions_round_2['id'] = submissions_round_2['sequence'].map(sequence_to_id)
 
-# Convert string representation of dict to actual dict
-submissions_pooled['scores'] = submissions_pooled['scores'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
+# Parse the dict-repr scores with C-level JSON instead of per-row literal_eval
+scores_raw = submissions_pooled['scores']
+scores_json = (
+    scores_raw.where(scores_raw.notna(), '{}')
+    .str.replace("'", '"', regex=False)
+    .str.replace('None', 'null', regex=False)
+)
+parsed_scores = [orjson.loads(s) for s in scores_json]
+submissions_pooled['scores'] = parsed_scores
 
 # Get all unique score keys across all dictionaries
 score_keys = set()
-for scores in submissions_pooled['scores'].dropna():
+for scores in parsed_scores:
     score_keys.update(scores.keys())
 
-for key in ['esm_pll', 'pae_interaction', 'plddt', 'iptm', 'ptm']:
-    submissions_pooled[key] = submissions_pooled['scores'].apply(lambda x: x.get(key) if isinstance(x, dict) else None)
-    submissions_round_1[key] = submissions_round_1['id'].map(submissions_pooled.set_index('id')[key])
-    submissions_round_2[key] = submissions_round_2['id'].map(submissions_pooled.set_index('id')[key])
+# Materialize all score columns in one typed pass straight into a float64
+# matrix, skipping the intermediate normalized frame
+score_cols = ['esm_pll', 'pae_interaction', 'plddt', 'iptm', 'ptm']
+score_matrix = np.fromiter(
+    (
+        value if (value := scores.get(key)) is not None else np.nan
+        for scores in parsed_scores
+        for key in score_cols
+    ),
+    dtype=np.float64,
+    count=len(parsed_scores) * len(score_cols),
+).reshape(-1, len(score_cols))
+submissions_pooled[score_cols] = score_matrix
+
+# Build the id index once and join all score columns in one reindex,
+# instead of rebuilding the index for every key and round
+pooled_by_id = submissions_pooled.set_index('id')
+submissions_round_1 = submissions_round_1.join(pooled_by_id[score_cols], on='id')
+submissions_round_2 = submissions_round_2.join(pooled_by_id[score_cols], on='id')
 
 # Rank the round 1 submissions to match ranking of the second round
 submissions_round_1 = submissions_round_1.sort_values('pae_interaction')
 submissions_round_1['top_100'] = submissions_round_1['pae_interaction'].rank() <= 100
 
-submissions_round_1 = submissions_round_1.drop('pae_interaction', axis=1)
-submissions_round_1 = submissions_round_1.drop('plddt', axis=1)
-submissions_round_1 = submissions_round_1.drop('iptm', axis=1)
-submissions_round_1 = submissions_round_1.drop('ptm', axis=1)
-submissions_round_1 = submissions_round_1.drop('esm_pll', axis=1)
+submissions_round_1 = submissions_round_1.drop(columns=score_cols)
 
 
 submissions_round_1 = pd.merge(
@@ -118,13 +167,15 @@ submissions['design_category'] = submissions['design_category'].replace({
 })
 
 submissions['de_novo'] = submissions['id'].map(
-     submissions_pooled.set_index('id')['is_de_novo']
+     pooled_by_id['is_de_novo']
 ).map({True: 'De novo', False: 'Existing binder'})
 
 submissions = submissions.drop('similarity_check', axis=1)
-homology_data = pd.read_csv('./data/raw/homology/homology_data.csv')
+homology_data = read_table('./data/raw/homology/homology_data.csv')
 submissions = pd.merge(submissions, homology_data, on='id', how='left')
-submissions['sequence_length'] = submissions['sequence'].apply(len)
+# Arrow-backed strings keep length/capitalize vectorized at the C level
+submissions['sequence'] = submissions['sequence'].astype('string[pyarrow]')
+submissions['sequence_length'] = submissions['sequence'].str.len()
 # Remove socials column if it exists
 # Define desired column order - ensure 'round' is included
 ordered_columns = [
@@ -166,24 +217,27 @@ for col in ['expression', 'binding_strength', 'model_category', 'design_category
     if col in submissions.columns:
         submissions[col] = submissions[col].str.capitalize()
 
-submissions['normalized_esm_pll'] = submissions['esm_pll'] / submissions['sequence_length']
-
+# Divide at the NumPy level and keep float32; the normalized PLL doesn't
+# need double precision and the narrower column cuts downstream memory traffic
+submissions['normalized_esm_pll'] = np.divide(
+    submissions['esm_pll'].to_numpy(dtype=np.float32),
+    submissions['sequence_length'].to_numpy(dtype=np.float32),
+)
 
-# Read and concatenate all competition metrics CSVs
-metrics_files = glob.glob('./data/processed/competition_metrics_csvs/*.csv')
 
-metrics_dfs = []
-for file in metrics_files:
-    try:
-        df = pd.read_csv(file)
-        metrics_dfs.append(df)
-    except Exception as e:
-        continue
+# Read and concatenate all competition metrics CSVs; PyArrow scans the
+# files in parallel and fuses the concat into a single table. scandir
+# skips the per-entry stat calls glob.glob pays for.
+_metrics_dir = './data/processed/competition_metrics_csvs'
+metrics_files = [
+    entry.path for entry in os.scandir(_metrics_dir)
+    if fnmatch.fnmatch(entry.name, '*.csv')
+] if os.path.isdir(_metrics_dir) else []
 
-if not metrics_dfs:
+if not metrics_files:
     raise RuntimeError("No metrics files were successfully loaded")
 
-metrics_combined = pd.concat(metrics_dfs, ignore_index=True)
+metrics_combined = ds.dataset(metrics_files, format='csv').to_table().to_pandas()
 
 # Merge with submissions and drop specified columns
 submissions = pd.merge(submissions, metrics_combined, on='id', how='left')
@@ -197,14 +251,14 @@ for col in ['expression', 'binding_strength']:
 
 
 # Read and merge Wells Wood TSV data
-wells_wood_df = pd.read_csv('./data/wells_wood/foldseek_adaptyv_destress_binder_merged.tsv', sep='\t')
+wells_wood_df = read_table('./data/wells_wood/foldseek_adaptyv_destress_binder_merged.tsv', sep='\t')
 
 # Prefix all columns except sequence with wells_wood_
 rename_cols = {col: f'wells_wood_{col}' for col in wells_wood_df.columns if col != 'sequence'}
 wells_wood_df = wells_wood_df.rename(columns=rename_cols)
 
 # Merge with submissions on sequence
-submissions = pd.merge(submissions, wells_wood_df, on='sequence', how='left')
+submissions = merge_on_sequence(submissions, wells_wood_df, how='left')
 
 
 submissions.to_csv('./data/processed/all_submissions.csv', index=False)
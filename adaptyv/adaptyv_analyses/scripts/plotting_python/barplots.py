@@ -17,16 +17,20 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import functools
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import matplotlib as mpl
+mpl.use("Agg")  # headless batch rendering; skip GUI event-loop setup
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd  # type: ignore
 
 
+@functools.lru_cache(maxsize=1)
 def _ensure_roboto_installed() -> str:
+  # The ttflist scan walks every installed font; do it once per process
   try:
     from matplotlib import font_manager
     available = {f.name for f in font_manager.fontManager.ttflist}
@@ -37,7 +41,15 @@ def _ensure_roboto_installed() -> str:
   return "DejaVu Sans"
 
 
+_THEMED = False
+
+
 def set_theme() -> None:
+  # rcParams only need to be written once per process
+  global _THEMED
+  if _THEMED:
+    return
+  _THEMED = True
   roboto = _ensure_roboto_installed()
   mpl.rcParams.update({
     "font.family": roboto,
@@ -63,6 +75,7 @@ def set_theme() -> None:
   })
 
 
+@functools.lru_cache(maxsize=1)
 def get_palettes() -> Dict[str, Dict[str, str]]:
   binding_colors = {
     "None": "#E5E7EB",
@@ -84,13 +97,6 @@ def get_palettes() -> Dict[str, Dict[str, str]]:
   other_hallucination_colors = {"Other hallucination": "#8CD2F4", "Other": "#E5E7EB"}
   metric_colors = {"ESM2 PLL": "#8CD2F4", "ipTM": "#8B90DD", "iPAE": "#3E6175"}
 
-  all_colors_list: List[str] = []
-  for pal in [binding_colors, expression_colors, selection_status_colors, design_category_colors,
-              bindcraft_colors, rfdiffusion_colors, esm_colors, timed_colors,
-              af2_backprop_colors, other_hallucination_colors, metric_colors]:
-    all_colors_list.extend(list(pal.values()))
-  all_unique = list(dict.fromkeys(all_colors_list))
-
   return {
     "binding_strength": binding_colors,
     "expression": expression_colors,
@@ -103,10 +109,16 @@ def get_palettes() -> Dict[str, Dict[str, str]]:
     "AF2_backprop": af2_backprop_colors,
     "Other_hallucination": other_hallucination_colors,
     "metric": metric_colors,
-    "_all": {str(i): c for i, c in enumerate(all_unique)},
   }
 
 
+# Deduplicated union of every palette, frozen once at import for indexed
+# fallback lookups in plot_bar
+_FALLBACK_COLORS: Tuple[str, ...] = tuple(dict.fromkeys(
+  color for pal in get_palettes().values() for color in pal.values()
+))
+
+
 def apply_blog_post_theme(fig: plt.Figure, ax: plt.Axes, *, title: str, subtitle: str, x_label: str, y_label: str, legend_title: str) -> None:
   set_theme()
   ax.set_xlabel(x_label)
@@ -140,41 +152,57 @@ def plot_bar(
   sort: str,
 ) -> Tuple[plt.Figure, plt.Axes]:
   set_theme()
-  data = df.copy()
 
-  if round_filter != "both" and "round" in data.columns:
+  # Combine every row predicate into one boolean mask and slice once at the
+  # end, instead of copying the full frame and re-filtering it repeatedly
+  mask = pd.Series(True, index=df.index)
+
+  if round_filter != "both" and "round" in df.columns:
     try:
       rn = int(round_filter)
-      data = data[data["round"] == rn]
+      mask &= df["round"] == rn
     except Exception:
       pass
 
-  if color_column in data.columns:
-    data[color_column] = data[color_column].where(~data[color_column].isna(), "missing data")
-
-  if top_n and top_n > 0 and x_column in data.columns:
-    counts_by_x = data[x_column].value_counts(dropna=False)
-    top_x_vals = list(counts_by_x.index[: min(top_n, counts_by_x.size)])
-    data = data[data[x_column].isin(top_x_vals)]
+  color_values = None
+  if color_column in df.columns:
+    color_values = df[color_column].where(~df[color_column].isna(), "missing data")
+
+  if top_n and top_n > 0 and x_column in df.columns:
+    # Factorize once and count on integer codes; top-N via argpartition
+    # instead of a full value_counts sort plus a second isin hash pass
+    codes, _ = pd.factorize(df[x_column].to_numpy(), use_na_sentinel=False)
+    masked_codes = codes[mask.to_numpy()]
+    if masked_codes.size:
+      counts = np.bincount(masked_codes)
+      k = min(top_n, int((counts > 0).sum()))
+      top_codes = np.argpartition(counts, -k)[-k:]
+      mask &= pd.Series(np.isin(codes, top_codes), index=df.index)
+    else:
+      mask &= False
 
   if remove_not_mentioned:
-    if color_column in data.columns:
-      data = data[data[color_column] != "Not mentioned"]
-    if x_column in data.columns:
-      data = data[data[x_column] != "Not mentioned"]
+    if color_values is not None:
+      mask &= color_values != "Not mentioned"
+    if x_column in df.columns:
+      mask &= df[x_column] != "Not mentioned"
 
   if remove_missing_data:
-    if color_column in data.columns:
-      mask = data[color_column].notna() & (data[color_column].astype(str) != "") & (data[color_column] != "Missing data")
-      data = data[mask]
-    if x_column in data.columns:
-      mask_x = data[x_column].notna() & (data[x_column].astype(str) != "") & (data[x_column] != "Missing data")
-      data = data[mask_x]
-
-  if x_column in data.columns and x_column == "selected":
-    data = data[data[x_column] != "No"]
-  if x_column in data.columns and x_column == "binding":
-    data = data[data[x_column] != "Unknown"]
+    if color_values is not None:
+      mask &= (color_values.astype(str) != "") & (color_values != "Missing data")
+    if x_column in df.columns:
+      mask &= df[x_column].notna() & (df[x_column].astype(str) != "") & (df[x_column] != "Missing data")
+
+  if x_column in df.columns and x_column == "selected":
+    mask &= df[x_column] != "No"
+  if x_column in df.columns and x_column == "binding":
+    mask &= df[x_column] != "Unknown"
+
+  # Narrow projection: only the plotted columns survive the slice
+  keep_cols = [c for c in dict.fromkeys([x_column, color_column]) if c in df.columns]
+  data = df.loc[mask, keep_cols].copy()
+  if color_values is not None:
+    data[color_column] = color_values.loc[mask]
 
   palettes = get_palettes()
   if color_column == "binding_strength" and color_column in data.columns:
@@ -214,45 +242,43 @@ def plot_bar(
   else:
     x_order = sorted(list(pd.unique(data[x_column]))) if x_column in data.columns else []
 
-  grouped = data.groupby([x_column, color_column]).size().reset_index(name="count")
-  if x_order:
-    grouped[x_column] = pd.Categorical(grouped[x_column], categories=x_order, ordered=True)
+  # Categorical dtypes make the aggregation below run on integer codes
   if color_levels:
-    grouped[color_column] = pd.Categorical(grouped[color_column], categories=color_levels, ordered=True)
-  grouped = grouped.sort_values([x_column, color_column])
-
-  totals = grouped.groupby(x_column, observed=False)["count"].sum().reset_index(name="total")
-
-  def _percent_for_row(x_value: str) -> int:
-    sub = grouped[grouped[x_column] == x_value]
-    total_n = int(sub["count"].sum())
-    if total_n == 0:
-      return 0
-    if color_column == "selected":
-      sel = sub[sub[color_column].isin(["Top 100", "Adaptyv selection"])]
-      return int(round(100 * sel["count"].sum() / total_n))
-    if color_column == "binding_strength":
-      sel = sub[sub[color_column].isin(["Weak", "Medium", "Strong"])]
-      return int(round(100 * sel["count"].sum() / total_n))
-    if color_column == "expression":
-      sel = sub[sub[color_column].isin(["Low", "Medium", "High"])]
-      return int(round(100 * sel["count"].sum() / total_n))
-    if color_column == "TIMED":
-      sel = sub[sub[color_column] != "Other"]
-      return int(round(100 * sel["count"].sum() / total_n))
-    if color_column in {"BindCraft", "RFdiffusion", "ESM", "AF2_backprop", "Other_hallucination"}:
-      sel = sub[sub[color_column].isin(["BindCraft", "RFdiffusion", "ESM", "AF2 backprop", "Other hallucination"])]
-      non_other = sel[~sel[color_column].isin(["Other"])]
-      return int(round(100 * non_other["count"].sum() / total_n))
-    return 0
-
-  totals["selected"] = [_percent_for_row(val) for val in totals[x_column].astype(str).tolist()]
-
-  palette_all = get_palettes()
-  palette = palette_all.get(color_column, palette_all["_all"])
-  categories_present = [c for c in color_levels if c in grouped[color_column].unique().tolist()]
+    data[color_column] = pd.Categorical(data[color_column], categories=color_levels)
+  if x_order:
+    data[x_column] = pd.Categorical(data[x_column], categories=x_order)
+
+  # Single hash aggregation in C: rows follow x_order, columns follow color_levels
+  counts_matrix = (
+    data.groupby([x_column, color_column], observed=True).size()
+    .unstack(color_column, fill_value=0)
+    .reindex(index=x_order, columns=color_levels, fill_value=0)
+  )
+
+  totals = counts_matrix.sum(axis=1).rename("total").rename_axis(x_column).reset_index()
+
+  # Numerator levels per color convention for the "% selected/binders/..." labels
+  numerator_levels = {
+    "selected": ["Top 100", "Adaptyv selection"],
+    "binding_strength": ["Weak", "Medium", "Strong"],
+    "expression": ["Low", "Medium", "High"],
+    "TIMED": ["TIMED", "ProteinMPNN", "ESM-IF"],
+    "BindCraft": ["BindCraft"],
+    "RFdiffusion": ["RFdiffusion"],
+    "ESM": ["ESM"],
+    "AF2_backprop": ["AF2 backprop"],
+    "Other_hallucination": ["Other hallucination"],
+  }
+
+  # One vectorized ratio over the counts matrix instead of a filter+sum per x value
+  num = counts_matrix.reindex(columns=numerator_levels.get(color_column, []), fill_value=0).sum(axis=1).to_numpy()
+  den = counts_matrix.sum(axis=1).to_numpy()
+  totals["selected"] = np.where(den > 0, np.rint(100 * num / np.maximum(den, 1)), 0).astype(int)
+
+  palette = palettes.get(color_column, {})
+  categories_present = [c for c in color_levels if counts_matrix[c].sum() > 0]
   color_map: Dict[str, str] = {}
-  fallback_colors = list(palette_all["_all"].values())
+  fallback_colors = _FALLBACK_COLORS
   idx = 0
   for cat in categories_present:
     color_map[cat] = palette.get(cat, fallback_colors[idx % len(fallback_colors)])
@@ -265,19 +291,15 @@ def plot_bar(
   bar_x = np.arange(len(x_order)) if x_order else np.arange(len(totals))
   bottoms = np.zeros(len(bar_x), dtype=float)
 
-  for level in color_levels:
-    if level not in grouped[color_column].cat.categories:
-      continue
-    sub = grouped[grouped[color_column] == level]
-    counts: List[int] = []
-    for xv in x_order:
-      row = sub[sub[x_column] == xv]
-      counts.append(int(row["count"].iloc[0]) if not row.empty else 0)
-    counts_arr = np.array(counts, dtype=float)
-    bars = ax.bar(bar_x, counts_arr, width=0.8, bottom=bottoms, color=color_map.get(level, "#E5E7EB"), edgecolor="black", linewidth=1.0, label=str(level))
-    for rect, c in zip(bars, counts_arr):
-      if c > 0 and rect.get_height() >= 1:
-        ax.text(rect.get_x() + rect.get_width()/2.0, rect.get_y() + rect.get_height()/2.0, f"{int(c)}", ha="center", va="center", color="white", fontsize=10, clip_on=True)
+  counts_2d = counts_matrix.to_numpy(dtype=float)
+  layer_colors = [color_map.get(level, "#E5E7EB") for level in color_levels]
+  rasterize = output_format.lower() == "png"
+  for j, level in enumerate(color_levels):
+    counts_arr = counts_2d[:, j]
+    bars = ax.bar(bar_x, counts_arr, width=0.8, bottom=bottoms, color=layer_colors[j], edgecolor="black", linewidth=1.0, label=str(level), rasterized=rasterize)
+    # One vectorized label pass per layer instead of a Text artist loop
+    labels = np.where(counts_arr >= 1, counts_arr.astype(int).astype(str), "")
+    ax.bar_label(bars, labels=labels.tolist(), label_type="center", color="white", fontsize=10)
     bottoms += counts_arr
 
   totals = totals.set_index(x_column).loc[x_order].reset_index()
@@ -334,7 +356,16 @@ def main() -> None:
   p.add_argument("--sort", type=str, default="size", choices=["size", "alpha"])
   args = p.parse_args()
 
-  df = pd.read_csv(args.input)
+  # Only the plotted columns are needed; the categorical x dtype keeps the
+  # downstream groupbys on integer codes. Fall back to a full read if the
+  # CSV doesn't have the requested columns.
+  usecols = list(dict.fromkeys(
+    [args.x_column, args.color_column] + (["round"] if args.round_filter != "both" else [])
+  ))
+  try:
+    df = pd.read_csv(args.input, usecols=usecols, dtype={args.x_column: "category"})
+  except ValueError:
+    df = pd.read_csv(args.input)
   plot_bar(
     df,
     x_column=args.x_column,
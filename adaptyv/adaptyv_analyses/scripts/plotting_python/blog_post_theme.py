@@ -10,35 +10,48 @@ Includes:
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Optional
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib.axes import Axes
-from matplotlib.figure import Figure
+# matplotlib (and especially pyplot's backend/font-cache setup) is imported
+# lazily inside the functions that need it, so importing this module for the
+# pure-Python palette helpers costs nothing
+if TYPE_CHECKING:
+  from matplotlib.axes import Axes
+  from matplotlib.figure import Figure
 
 
 # -----------------------------
 # Theme configuration
 # -----------------------------
 
+@lru_cache(maxsize=1)
 def _ensure_roboto_installed() -> str:
   """Return the name of a usable Roboto font family if available, else fallback.
 
   Attempts to use "Roboto" if present in the Matplotlib font manager. If not
   available, returns a generic sans-serif family. This keeps plotting robust
-  without requiring a runtime font download.
+  without requiring a runtime font download. The installed fonts don't change
+  within a process, so the (potentially large) font list is scanned at most
+  once and short-circuits on the first hit.
   """
   try:
     from matplotlib import font_manager
-    available = {f.name for f in font_manager.fontManager.ttflist}
-    if "Roboto" in available:
+    if any(f.name == "Roboto" for f in font_manager.fontManager.ttflist):
       return "Roboto"
   except Exception:
     pass
   return "DejaVu Sans"
 
 
+_theme_applied = False
+
+# The override dict is stable once the font family is resolved, so it is
+# built lazily on first use and reused by every later theme application
+_rcparams_overrides: Optional[dict] = None
+
+
 def set_adaptyv_matplotlib_theme() -> None:
   """Apply Matplotlib rcParams to match the R `adaptyv_theme` as closely as possible.
 
@@ -47,136 +60,153 @@ def set_adaptyv_matplotlib_theme() -> None:
   - Axis titles size 12 bold; tick labels size 10; x tick labels typically 14 in plots
   - White backgrounds; no panel grid; black axis spines 0.5 linewidth
   - Legend on right with white background and black border
+
+  Applied once per process; the rcParams update is skipped on later calls
+  unless the font family was externally reset (e.g. by rcdefaults()).
   """
-  roboto = _ensure_roboto_installed()
+  import matplotlib as mpl
 
-  mpl.rcParams.update({
-    # Base font
-    "font.family": roboto,
-    "text.color": "#333333",
-    "axes.labelcolor": "#333333",
-    "xtick.color": "#333333",
-    "ytick.color": "#333333",
-
-    # Figure and axes backgrounds
-    "figure.facecolor": "white",
-    "axes.facecolor": "white",
-
-    # Grid (off, to match panel.grid.blank in R barplots.R)
-    "axes.grid": False,
-
-    # Spines (axis lines)
-    "axes.edgecolor": "black",
-    "axes.linewidth": 0.5,
-
-    # Legend styling
-    "legend.frameon": True,
-    "legend.edgecolor": "black",
-    "legend.framealpha": 1.0,
-    "legend.facecolor": "white",
-
-    # Title/labels sizing defaults (exact values set in plotting function)
-    "axes.titlesize": 20,
-    "axes.titleweight": "bold",
-    "axes.labelsize": 12,
-    "axes.labelweight": "bold",
-    "xtick.labelsize": 10,
-    "ytick.labelsize": 10,
-  })
+  global _theme_applied, _rcparams_overrides
+  roboto = _ensure_roboto_installed()
+  if _theme_applied and mpl.rcParams["font.family"] == [roboto]:
+    return
+
+  if _rcparams_overrides is None:
+    _rcparams_overrides = {
+      # Base font
+      "font.family": roboto,
+      "text.color": "#333333",
+      "axes.labelcolor": "#333333",
+      "xtick.color": "#333333",
+      "ytick.color": "#333333",
+
+      # Figure and axes backgrounds
+      "figure.facecolor": "white",
+      "axes.facecolor": "white",
+
+      # Grid (off, to match panel.grid.blank in R barplots.R)
+      "axes.grid": False,
+
+      # Spines (axis lines)
+      "axes.edgecolor": "black",
+      "axes.linewidth": 0.5,
+
+      # Legend styling
+      "legend.frameon": True,
+      "legend.edgecolor": "black",
+      "legend.framealpha": 1.0,
+      "legend.facecolor": "white",
+
+      # Title/labels sizing defaults (exact values set in plotting function)
+      "axes.titlesize": 20,
+      "axes.titleweight": "bold",
+      "axes.labelsize": 12,
+      "axes.labelweight": "bold",
+      "xtick.labelsize": 10,
+      "ytick.labelsize": 10,
+    }
+
+  mpl.rcParams.update(_rcparams_overrides)
+  _theme_applied = True
 
 
 # -----------------------------
 # Palettes (mirroring barplots.R)
 # -----------------------------
 
-def get_adaptyv_palettes() -> Dict[str, Dict[str, str]]:
-  """Return all palettes used across plots, matching R definitions exactly."""
-  binding_colors = {
-    "None": "#E5E7EB",
-    "Not expressed": "#9EA2AF",
-    "Weak": "#C4B2FB",
-    "Medium": "#A7C1FB",
-    "Strong": "#2A4DD0",
-    "Missing binding data": "#3E6175",
-    "% binders": "#DC7A73",
-  }
-
-  expression_colors = {
-    "None": "#E5E7EB",
-    "Low": "#9EA2AF",
-    "Medium": "#E9C435",
-    "High": "#69B7A7",
-  }
-
-  selection_status_colors = {
-    "Top 100": "#8B90DD",
-    "Adaptyv selection": "#8CD2F4",
-    "Not selected": "#E5E7EB",
-  }
-
-  design_category_colors = {
-    "De novo": "#56A6D4",
-    "Optimized binder": "#8B90DD",
-    "Diversified binder": "#8CD2F4",
-    "Hallucination": "#3E6175",
-  }
-
-  # Binary model-type columns map Yes/No to distinctive vs. gray
-  model_type_colors = {"Yes": "#56A6D4", "No": "#E5E7EB"}
-
-  bindcraft_colors = {"BindCraft": "#56A6D4", "Other": "#E5E7EB"}
-  rfdiffusion_colors = {"RFdiffusion": "#8B90DD", "Other": "#E5E7EB"}
-  esm_colors = {"ESM": "#8CD2F4", "Other": "#E5E7EB"}
-
-  timed_colors = {
-    "TIMED": "#56A6D4",
-    "ProteinMPNN": "#8B90DD",
-    "ESM-IF": "#8CD2F4",
-    "Other": "#E5E7EB",
-  }
-
-  af2_backprop_colors = {"AF2 backprop": "#8CD2F4", "Other": "#E5E7EB"}
-  other_hallucination_colors = {"Other hallucination": "#8CD2F4", "Other": "#E5E7EB"}
-
-  metric_colors = {"ESM2 PLL": "#8CD2F4", "ipTM": "#8B90DD", "iPAE": "#3E6175"}
-
-  # Aggregate unique palette colors for fallback
-  all_colors_list: List[str] = []
-  for pal in [
-    binding_colors,
-    expression_colors,
-    selection_status_colors,
-    design_category_colors,
-    model_type_colors,
-    bindcraft_colors,
-    rfdiffusion_colors,
-    esm_colors,
-    timed_colors,
-    af2_backprop_colors,
-    other_hallucination_colors,
-    metric_colors,
-  ]:
-    all_colors_list.extend(list(pal.values()))
-  adaptyv_colors_unique = list(dict.fromkeys(all_colors_list))
-
-  return {
-    "binding_strength": binding_colors,
-    "expression": expression_colors,
-    "selected": selection_status_colors,
-    "design_category": design_category_colors,
-    "model_type": model_type_colors,
-    "BindCraft": bindcraft_colors,
-    "RFdiffusion": rfdiffusion_colors,
-    "ESM": esm_colors,
-    "TIMED": timed_colors,
-    "AF2_backprop": af2_backprop_colors,
-    "Other_hallucination": other_hallucination_colors,
-    "metric": metric_colors,
-    "_all": {str(i): c for i, c in enumerate(adaptyv_colors_unique)},
-  }
-
-
-def _palette_for_column(color_column: str, palettes: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+# The palettes are compile-time constants, so they live at module scope
+# as read-only mappings built exactly once at import; palette access is
+# allocation-free and the shared objects have stable identity
+_BINDING_COLORS = MappingProxyType({
+  "None": "#E5E7EB",
+  "Not expressed": "#9EA2AF",
+  "Weak": "#C4B2FB",
+  "Medium": "#A7C1FB",
+  "Strong": "#2A4DD0",
+  "Missing binding data": "#3E6175",
+  "% binders": "#DC7A73",
+})
+
+_EXPRESSION_COLORS = MappingProxyType({
+  "None": "#E5E7EB",
+  "Low": "#9EA2AF",
+  "Medium": "#E9C435",
+  "High": "#69B7A7",
+})
+
+_SELECTION_STATUS_COLORS = MappingProxyType({
+  "Top 100": "#8B90DD",
+  "Adaptyv selection": "#8CD2F4",
+  "Not selected": "#E5E7EB",
+})
+
+_DESIGN_CATEGORY_COLORS = MappingProxyType({
+  "De novo": "#56A6D4",
+  "Optimized binder": "#8B90DD",
+  "Diversified binder": "#8CD2F4",
+  "Hallucination": "#3E6175",
+})
+
+# Binary model-type columns map Yes/No to distinctive vs. gray
+_MODEL_TYPE_COLORS = MappingProxyType({"Yes": "#56A6D4", "No": "#E5E7EB"})
+
+_BINDCRAFT_COLORS = MappingProxyType({"BindCraft": "#56A6D4", "Other": "#E5E7EB"})
+_RFDIFFUSION_COLORS = MappingProxyType({"RFdiffusion": "#8B90DD", "Other": "#E5E7EB"})
+_ESM_COLORS = MappingProxyType({"ESM": "#8CD2F4", "Other": "#E5E7EB"})
+
+_TIMED_COLORS = MappingProxyType({
+  "TIMED": "#56A6D4",
+  "ProteinMPNN": "#8B90DD",
+  "ESM-IF": "#8CD2F4",
+  "Other": "#E5E7EB",
+})
+
+_AF2_BACKPROP_COLORS = MappingProxyType({"AF2 backprop": "#8CD2F4", "Other": "#E5E7EB"})
+_OTHER_HALLUCINATION_COLORS = MappingProxyType({"Other hallucination": "#8CD2F4", "Other": "#E5E7EB"})
+
+_METRIC_COLORS = MappingProxyType({"ESM2 PLL": "#8CD2F4", "ipTM": "#8B90DD", "iPAE": "#3E6175"})
+
+
+def _unique_color_index(palettes) -> Dict[str, str]:
+  """Aggregate unique palette colors for fallback in one streaming pass."""
+  index: Dict[str, str] = {}
+  seen: set = set()
+  for pal in palettes:
+    for color in pal.values():
+      if color not in seen:
+        seen.add(color)
+        index[str(len(index))] = color
+  return index
+
+
+_PALETTES: Dict[str, Mapping[str, str]] = {
+  "binding_strength": _BINDING_COLORS,
+  "expression": _EXPRESSION_COLORS,
+  "selected": _SELECTION_STATUS_COLORS,
+  "design_category": _DESIGN_CATEGORY_COLORS,
+  "model_type": _MODEL_TYPE_COLORS,
+  "BindCraft": _BINDCRAFT_COLORS,
+  "RFdiffusion": _RFDIFFUSION_COLORS,
+  "ESM": _ESM_COLORS,
+  "TIMED": _TIMED_COLORS,
+  "AF2_backprop": _AF2_BACKPROP_COLORS,
+  "Other_hallucination": _OTHER_HALLUCINATION_COLORS,
+  "metric": _METRIC_COLORS,
+}
+_PALETTES["_all"] = MappingProxyType(_unique_color_index(_PALETTES.values()))
+_ALL_PALETTES: Mapping[str, Mapping[str, str]] = MappingProxyType(_PALETTES)
+
+
+def get_adaptyv_palettes() -> Mapping[str, Mapping[str, str]]:
+  """Return all palettes used across plots, matching R definitions exactly.
+
+  A constant lookup: the read-only mapping is built once at import, so
+  callers always see the same immutable instance.
+  """
+  return _ALL_PALETTES
+
+
+def _palette_for_column(color_column: str, palettes: Mapping[str, Mapping[str, str]]) -> Mapping[str, str]:
   """Return palette for a given column, or the combined palette as fallback."""
   return palettes.get(color_column, palettes["_all"])
 
@@ -222,7 +252,9 @@ def apply_adaptyv_blog_post_theme(
     leg.get_frame().set_edgecolor("black")
     leg.get_frame().set_facecolor("white")
 
-  plt.subplots_adjust(right=0.78, left=0.12, top=0.90, bottom=0.22)
+  # Adjust the figure we were handed directly; going through pyplot made
+  # the layout depend on gcf() state and needed the pyplot import at all
+  fig.subplots_adjust(right=0.78, left=0.12, top=0.90, bottom=0.22)
 
 
 # Plotting functions have been moved to scripts/plotting_python/barplots.py.
@@ -1,17 +1,130 @@
+import json
 import os
 import pandas as pd
 from loguru import logger
 from pathlib import Path
 import multiprocess as mp
-import functools
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from src.setup.pyrosetta import initialize_pyrosetta
 from src.utils.pdb import clean_pdb, add_cryst1_record
-from src.utils.interface import analyze_interface_contacts
+from src.utils.interface import analyze_interface_contacts, parse_structure
 from src.utils.scores import score_interface
 from src.utils.dssp import calc_ss_percentage
 from src.processing.parse import get_pdb_files
-from src.utils.relax import pr_relax
+from src.utils.relax import pr_relax, get_relax_objects
+
+_worker_state = {}
+
+def init_worker(pdb_files, save_path, dssp_path, binder_chain, target_chain):
+    """Initialize PyRosetta and stash per-worker constants in module globals
+
+    Ships the pdb_files index once per worker instead of pickling it into
+    every dispatched task.
+    """
+    initialize_pyrosetta()
+    get_relax_objects()
+    _worker_state.update(
+        pdb_files=pdb_files,
+        save_path=save_path,
+        dssp_path=dssp_path,
+        binder_chain=binder_chain,
+        target_chain=target_chain,
+    )
+
+def _worker(submission_data):
+    return process_submission(
+        submission_data,
+        pdb_files=_worker_state['pdb_files'],
+        save_path=_worker_state['save_path'],
+        dssp_path=_worker_state['dssp_path'],
+        binder_chain=_worker_state['binder_chain'],
+        target_chain=_worker_state['target_chain'],
+    )
+
+def _flatten_result(result):
+    """Convert one process_submission return tuple into a result row"""
+    submission_id = None
+    try:
+        submission_id, sequence, dssp_results, interface_results, contact_results, error = result
+
+        if error:
+            logger.error(f"Error processing submission {submission_id}: {error}")
+            logger.error(f"Sequence: {sequence}")
+            return {
+                'id': submission_id,
+                'error': error,
+                'status': 'failed'
+            }
+
+        if not all([dssp_results, interface_results, contact_results]):
+            error_msg = f"Missing results for submission {submission_id}"
+            logger.error(error_msg)
+            return {
+                'id': submission_id,
+                'error': error_msg,
+                'status': 'failed'
+            }
+
+        # Unpack the interface results tuple
+        interface_metrics, aa_counts, interface_residues = interface_results
+
+        logger.info(f"Successfully processed submission {submission_id}")
+        return {
+            'id': submission_id,
+            'helix_pct': dssp_results[0],
+            'sheet_pct': dssp_results[1],
+            'loop_pct': dssp_results[2],
+            'i_helix_pct': dssp_results[3],
+            'i_sheet_pct': dssp_results[4],
+            'i_loop_pct': dssp_results[5],
+            'i_plddt': dssp_results[6],
+            'ss_plddt': dssp_results[7],
+            **interface_metrics,  # Unpack the metrics dictionary
+            'aa_counts': str(aa_counts),  # Convert to string to ensure serialization
+            'interface_residues': str(interface_residues),  # Convert to string to ensure serialization
+            **contact_results,
+            'status': 'success'
+        }
+    except Exception as e:
+        logger.error(f"Error processing result: {str(e)}", exc_info=True)
+        return {
+            'id': submission_id,
+            'error': str(e),
+            'status': 'failed'
+        }
+
+def _analyze_one(pdb_path, dssp_path, binder_chain, target_chain):
+    """Run all per-structure analyses for one PDB file"""
+    ok, structure = _safe(parse_structure, pdb_path)
+    if not ok:
+        structure = None
+    return {
+        'dssp': _safe(calc_ss_percentage, pdb_path, dssp_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure),
+        'interface': _safe(score_interface, pdb_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure),
+        'contact': _safe(analyze_interface_contacts, pdb_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure),
+    }
+
+def analyze_many(pdb_files, dssp_path, workers=None, binder_chain="A", target_chain="B"):
+    """Analyze many PDB files in parallel, keyed by submission ID
+
+    Standalone driver for ad-hoc runs outside process_submissions_batch.
+    The analyses have no cross-file dependencies, so they fan out over a
+    process pool; each worker initializes PyRosetta once. Small inputs run
+    serially since pool startup would dominate.
+    """
+    ids, paths = list(pdb_files.keys()), list(pdb_files.values())
+    if len(ids) <= 4:
+        initialize_pyrosetta()
+        return {sid: _analyze_one(path, dssp_path, binder_chain, target_chain)
+                for sid, path in zip(ids, paths)}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initialize_pyrosetta) as executor:
+        results = executor.map(
+            _analyze_one, paths,
+            [dssp_path] * len(ids), [binder_chain] * len(ids), [target_chain] * len(ids),
+        )
+        return dict(zip(ids, results))
 
 def save_batch_results(all_results, submissions, save_path):
     if len(all_results) > 0:
@@ -23,7 +136,15 @@ def save_batch_results(all_results, submissions, save_path):
         output_path = os.path.join(results_dir, "final_results.csv")
         
         results_df = pd.DataFrame(all_results)
-        
+
+        # Merge on shared categorical codes; hashing int codes beats
+        # re-hashing the object id strings on both sides
+        id_cats = pd.api.types.union_categoricals([
+            pd.Categorical(submissions['id']), pd.Categorical(results_df['id'])
+        ]).categories
+        submissions = submissions.assign(id=pd.Categorical(submissions['id'], categories=id_cats))
+        results_df['id'] = pd.Categorical(results_df['id'], categories=id_cats)
+
         merged_df = submissions.merge(results_df, on='id', how='left')
         
         merged_df.to_csv(output_path, index=False)
@@ -33,73 +154,107 @@ def save_batch_results(all_results, submissions, save_path):
         logger.error("No submissions were processed successfully in batch")
         return False
 
+def _safe(fn, *args, **kwargs):
+    """Run a pipeline step, returning (ok, value-or-error-message)
+
+    Keeps exception handling out of the per-submission control flow: the
+    common failure path costs a tuple, not a traceback capture.
+    """
+    try:
+        return True, fn(*args, **kwargs)
+    except Exception as e:
+        return False, f"{fn.__name__} failed: {e}"
+
 def process_submission(submission_data, pdb_files, dssp_path, save_path = '/root/competition_vol', binder_chain="A", target_chain="B"):
     """Process a single submission with structure relaxation, DSSP and interface scoring"""
     try:
         submission_id = submission_data['id']
         submission_sequence = submission_data['sequence']
-        
+
         if submission_id not in pdb_files:
             error_msg = f"No PDB file found for submission {submission_id}"
             logger.warning(error_msg)
             return submission_id, submission_sequence, None, None, None, error_msg
-        
+
         pdb_path = pdb_files[submission_id]
-        
+
+        relaxed_dir = os.path.join(save_path, "relaxed")
+        os.makedirs(relaxed_dir, exist_ok=True)
+        relaxed_path = os.path.join(relaxed_dir, f"{submission_id}.pdb")
+
+        # Skip relax/DSSP/scoring entirely when a prior run already
+        # produced the relaxed structure and its cached result dicts
+        cache_path = relaxed_path + ".results.json"
+        if os.path.exists(relaxed_path) and os.path.exists(cache_path):
+            try:
+                with open(cache_path) as f:
+                    cached = json.load(f)
+                if {"dssp", "interface", "contact"} <= cached.keys():
+                    logger.info(f"Using cached results for {submission_id}")
+                    return (submission_id, submission_sequence, cached["dssp"],
+                            tuple(cached["interface"]), cached["contact"], None)
+            except Exception:
+                pass  # unreadable cache; recompute below
+
         # First relax the structure using pr_relax
-        try:
-            relaxed_dir = os.path.join(save_path, "relaxed")
-            os.makedirs(relaxed_dir, exist_ok=True)
-            relaxed_path = os.path.join(relaxed_dir, f"{submission_id}.pdb")
-            
-            success = pr_relax(pdb_path, relaxed_path)
-            if not success:
-                raise ValueError("Structure relaxation failed")
-                
-            # Use relaxed structure for subsequent analysis
-            pdb_path = relaxed_path
-            logger.info(f"Successfully relaxed structure for {submission_id}")
-            
-        except Exception as e:
-            error_msg = f"Structure relaxation failed for {submission_id}: {str(e)}"
+        ok, relaxed = _safe(pr_relax, pdb_path, relaxed_path)
+        if not ok or not relaxed:
+            error_msg = f"Structure relaxation failed for {submission_id}" + (f": {relaxed}" if not ok else "")
             logger.error(error_msg)
             return submission_id, submission_sequence, None, None, None, error_msg
 
+        # Use relaxed structure for subsequent analysis
+        pdb_path = relaxed_path
+        logger.info(f"Successfully relaxed structure for {submission_id}")
+
+        # Parse the relaxed PDB once (via the mtime-keyed cache) and share
+        # the structure across DSSP, interface scoring and contact analysis;
+        # on failure each step falls back to its own parse
+        ok, structure = _safe(parse_structure, pdb_path)
+        if not ok:
+            logger.warning(f"Shared PDB parse failed for {submission_id}: {structure}")
+            structure = None
+
         # Get DSSP results
-        try:
-            dssp_results = calc_ss_percentage(pdb_path, dssp_path, binder_chain=binder_chain, target_chain=target_chain)
-            if not dssp_results:
-                raise ValueError("DSSP calculation returned None")
-            logger.info(f"DSSP results for {submission_id}: {dssp_results}")
-        except Exception as e:
-            error_msg = f"DSSP calculation failed for {submission_id}: {str(e)}"
+        ok, dssp_results = _safe(calc_ss_percentage, pdb_path, dssp_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure)
+        if not ok or not dssp_results:
+            error_msg = f"DSSP calculation failed for {submission_id}: {dssp_results if not ok else 'calculation returned None'}"
             logger.error(error_msg)
             return submission_id, submission_sequence, None, None, None, error_msg
+        logger.info(f"DSSP results for {submission_id}: {dssp_results}")
 
         # Get interface results
-        try:
-            interface_results = score_interface(pdb_path, binder_chain=binder_chain, target_chain=target_chain)
-            if not interface_results:
-                raise ValueError("Interface scoring returned None")
-            logger.info(f"Interface results for {submission_id}: {interface_results}")
-        except Exception as e:
-            error_msg = f"Interface scoring failed for {submission_id}: {str(e)}"
+        ok, interface_results = _safe(score_interface, pdb_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure)
+        if not ok or not interface_results:
+            error_msg = f"Interface scoring failed for {submission_id}: {interface_results if not ok else 'scoring returned None'}"
             logger.error(error_msg)
             return submission_id, submission_sequence, None, None, None, error_msg
+        logger.info(f"Interface results for {submission_id}: {interface_results}")
 
         # Get contact analysis
-        try:
-            contact_results = analyze_interface_contacts(pdb_path, binder_chain=binder_chain, target_chain=target_chain)
-            if not contact_results:
-                raise ValueError("Contact analysis returned None")
-            logger.info(f"Contact analysis for {submission_id}: {contact_results}")
-        except Exception as e:
-            error_msg = f"Contact analysis failed for {submission_id}: {str(e)}"
+        ok, contact_results = _safe(analyze_interface_contacts, pdb_path, binder_chain=binder_chain, target_chain=target_chain, structure=structure)
+        if not ok or not contact_results:
+            error_msg = f"Contact analysis failed for {submission_id}: {contact_results if not ok else 'analysis returned None'}"
             logger.error(error_msg)
             return submission_id, submission_sequence, None, None, None, error_msg
+        logger.info(f"Contact analysis for {submission_id}: {contact_results}")
+
+        # Persist the result dicts next to the relaxed structure (atomic
+        # rename) so reruns short-circuit straight to result assembly
+        try:
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "dssp": list(dssp_results),
+                    "interface": list(interface_results),
+                    "contact": contact_results,
+                }, f, default=str)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write results cache for {submission_id}: {str(e)}")
 
         return submission_id, submission_sequence, dssp_results, interface_results, contact_results, None
-        
+
     except Exception as e:
         error_msg = f"Error processing submission {submission_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
@@ -126,112 +281,81 @@ def process_submissions_batch(input_csv: str, structure_dirs: list, start_idx: i
             logger.error(f"No submissions found in range {start_idx}-{end_idx}")
             return False
             
-        # Get PDB files
-        pdb_files = get_pdb_files(volume_structure_dirs)
+        # Get PDB files (cached index reused across batch invocations)
+        pdb_files = get_pdb_files(
+            volume_structure_dirs,
+            cache_path=os.path.join(save_path, "pdb_index.pkl"),
+        )
         logger.info(f"Found {len(pdb_files)} PDB files")
         
         # Process submissions
         dssp_path = "/root/bindcraft/functions/dssp"
-        all_results = []
-        
-        # Create submission data list - pass Series instead of tuples
-        submission_data = [row for _, row in submissions.iterrows()]
+
+        # Columnar accumulator: one list per column instead of a list of
+        # per-row dicts, so the final DataFrame build skips row-wise inference
+        result_columns = {}
+        n_rows = 0
+
+        def append_result_row(row):
+            nonlocal n_rows
+            for key in row.keys() - result_columns.keys():
+                result_columns[key] = [None] * n_rows
+            for key, values in result_columns.items():
+                values.append(row.get(key))
+            n_rows += 1
+
+        # Plain dicts pickle far smaller than per-row Series and only the two
+        # used columns are shipped to workers
+        submission_data = submissions[["id", "sequence"]].to_dict(orient="records")
         
-        # Process submissions in parallel using multiprocess Pool
-        num_cores = mp.cpu_count()
+        # Process submissions in parallel using multiprocess Pool. Pin the
+        # math libraries to one thread each so PyRosetta workers don't
+        # oversubscribe the cores, and don't spawn more workers than tasks.
+        os.environ.setdefault("OMP_NUM_THREADS", "1")
+        os.environ.setdefault("MKL_NUM_THREADS", "1")
+        num_cores = min(mp.cpu_count(), len(submission_data))
         logger.info(f"Using {num_cores} CPU cores for parallel processing")
         
-        # Initialize PyRosetta in each worker process
-        def init_worker():
-            initialize_pyrosetta()
-        
-        with mp.Pool(processes=num_cores, initializer=init_worker) as pool:
-            # Create partial function with fixed arguments
-            process_func = functools.partial(
-                process_submission, 
-                pdb_files=pdb_files, 
-                save_path=save_path,
-                dssp_path=dssp_path,
-                binder_chain="A",
-                target_chain="B"
-            )
-            
+        # Recycle workers every few tasks: PyRosetta leaks memory in
+        # long-lived processes, and fresh children keep RSS bounded.
+        # forkserver children start from a lean template process instead of
+        # duplicating the fat parent heap.
+        # Stream each flattened row to a JSONL checkpoint as workers finish,
+        # so a crash mid-batch doesn't lose the completed submissions
+        stream_path = os.path.join(save_path, "results", f"batch_{start_idx}_{end_idx}_stream.jsonl")
+        os.makedirs(os.path.dirname(stream_path), exist_ok=True)
+
+        ctx = mp.get_context("forkserver")
+        with open(stream_path, "w") as stream_file, ctx.Pool(
+            processes=num_cores,
+            initializer=init_worker,
+            initargs=(pdb_files, save_path, dssp_path, "A", "B"),
+            maxtasksperchild=16,
+        ) as pool:
             # Process submissions in parallel with progress bar
-            results = []
+            chunksize = max(1, len(submission_data) // (num_cores * 4))
             with tqdm(total=len(submission_data), desc=f"Processing batch {start_idx}-{end_idx}") as pbar:
-                for result in pool.imap_unordered(process_func, submission_data):
-                    results.append(result)
+                for result in pool.imap_unordered(_worker, submission_data, chunksize=chunksize):
+                    row = _flatten_result(result)
+                    append_result_row(row)
+                    stream_file.write(json.dumps(row, default=str) + "\n")
                     pbar.update()
-        
-        # Process results
-        for result in results:
-            try:
-                submission_id, sequence, dssp_results, interface_results, contact_results, error = result
-                
-                if error:
-                    logger.error(f"Error processing submission {submission_id}: {error}")
-                    logger.error(f"Sequence: {sequence}")
-                    # Add failed submission with error message
-                    all_results.append({
-                        'id': submission_id,
-                        'error': error,
-                        'status': 'failed'
-                    })
-                    continue
-                    
-                if not all([dssp_results, interface_results, contact_results]):
-                    error_msg = f"Missing results for submission {submission_id}"
-                    logger.error(error_msg)
-                    all_results.append({
-                        'id': submission_id,
-                        'error': error_msg,
-                        'status': 'failed'
-                    })
-                    continue
-                    
-                # Unpack the interface results tuple
-                interface_metrics, aa_counts, interface_residues = interface_results
-                
-                result_dict = {
-                    'id': submission_id,
-                    'helix_pct': dssp_results[0],
-                    'sheet_pct': dssp_results[1], 
-                    'loop_pct': dssp_results[2],
-                    'i_helix_pct': dssp_results[3],
-                    'i_sheet_pct': dssp_results[4],
-                    'i_loop_pct': dssp_results[5],
-                    'i_plddt': dssp_results[6],
-                    'ss_plddt': dssp_results[7],
-                    **interface_metrics,  # Unpack the metrics dictionary
-                    'aa_counts': str(aa_counts),  # Convert to string to ensure serialization
-                    'interface_residues': str(interface_residues),  # Convert to string to ensure serialization
-                    **contact_results,
-                    'status': 'success'
-                }
-                all_results.append(result_dict)
-                logger.info(f"Successfully processed submission {submission_id}")
-            except Exception as e:
-                logger.error(f"Error processing result: {str(e)}", exc_info=True)
-                if 'submission_id' in locals():
-                    all_results.append({
-                        'id': submission_id,
-                        'error': str(e),
-                        'status': 'failed'
-                    })
-                continue
 
         # Convert results to DataFrame and ensure consistent columns
-        if len(all_results) > 0:
-            logger.info(f"Processed {len(all_results)} submissions")
+        if n_rows > 0:
+            logger.info(f"Processed {n_rows} submissions")
             try:
-                results_df = pd.DataFrame(all_results)
+                results_df = pd.DataFrame(result_columns)
                 # Ensure all failed entries have NaN for numeric columns
                 numeric_columns = results_df.select_dtypes(include=['float64', 'int64']).columns
                 results_df.loc[results_df['status'] == 'failed', numeric_columns] = pd.NA
                 return results_df.to_dict('records')
             except Exception as e:
                 logger.error(f"Error converting results to DataFrame: {str(e)}", exc_info=True)
-                return all_results
+                return [
+                    {key: values[i] for key, values in result_columns.items()}
+                    for i in range(n_rows)
+                ]
         else:
             logger.error("No submissions were processed successfully in batch")
             return []
@@ -1,24 +1,52 @@
 import os
-import glob
+import pickle
+import re
 from loguru import logger
 
-def get_pdb_files(structure_dirs):
-    """Get dictionary of submission ID to PDB file path"""
+# Compiled once at import; matching per scandir entry stays C-level
+_UNRELAXED_PDB_RE = re.compile(r'.*_unrelaxed_rank_\d+_.*\.pdb$')
+_RANK001_RE = re.compile(r'.*_unrelaxed_rank_001_.*\.pdb$')
+
+def get_pdb_files(structure_dirs, cache_path=None):
+    """Get dictionary of submission ID to PDB file path
+
+    Enumerates with os.scandir and, when `cache_path` is given, reuses a
+    pickled index for as long as the directory mtimes are unchanged, so
+    repeated batch jobs skip the filesystem metadata traffic.
+    """
     logger.info(f"Searching for PDB files in: {structure_dirs}")
-    pdb_files = {}
 
+    dir_mtimes = {d: os.path.getmtime(d) for d in structure_dirs if os.path.exists(d)}
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('dir_mtimes') == dir_mtimes:
+                logger.info(f"Reusing cached PDB index ({len(cached['pdb_files'])} files)")
+                return cached['pdb_files']
+        except Exception:
+            pass  # stale or corrupt cache; rebuild below
+
+    pdb_files = {}
     for directory in structure_dirs:
-        if not os.path.exists(directory):
+        if directory not in dir_mtimes:
             logger.warning(f"Directory does not exist: {directory}")
             continue
-            
-        for filename in os.listdir(directory):
-        
-            # Extract submission ID from filename (everything before first underscore)
-            submission_id = filename.split('.')[0]
-            
-            pdb_files[submission_id] = os.path.join(directory, filename)
-            
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Extract submission ID from filename (everything before first dot)
+                submission_id = entry.name.split('.')[0]
+                pdb_files[submission_id] = entry.path
+
+    if cache_path:
+        try:
+            with open(cache_path + '.tmp', 'wb') as f:
+                pickle.dump({'dir_mtimes': dir_mtimes, 'pdb_files': pdb_files}, f)
+            os.replace(cache_path + '.tmp', cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write PDB index cache: {str(e)}")
+
     logger.info(f"Found {len(pdb_files)} PDB files")
     return pdb_files
 
@@ -29,71 +57,38 @@ def check_missing_relaxed_structures(structure_dirs, save_path, data_path):
 
     missing_relaxed = []
     alternative_ranks = {}
-    
-    # Get all unrelaxed structures
-    unrelaxed_pdbs = []
+
+    # Single scan per directory, partitioning entries by submission id up
+    # front, instead of one glob for rank_001 files plus another glob per
+    # missing submission for its alternative ranks
+    by_submission = {}
     for dir in structure_dirs:
-        unrelaxed_pdbs.extend(glob.glob(f"{data_path}/{dir}/*unrelaxed_rank_001_*.pdb"))
-    
-    # Check each unrelaxed structure
-    for pdb in unrelaxed_pdbs:
-        base_name = os.path.basename(pdb)
-        submission_id = base_name.split('_unrelaxed')[0]
-        
-        # Expected relaxed path
-        relaxed_dir = f"{save_path}/relaxed"
-        relaxed_pdb = os.path.join(relaxed_dir, base_name.replace('unrelaxed', 'relaxed'))
-        
-        if not os.path.exists(relaxed_pdb):
-            missing_relaxed.append(submission_id)
-            
-            # Check for alternative ranks
-            base_dir = os.path.dirname(pdb)
-            alt_ranks = glob.glob(f"{base_dir}/{submission_id}_unrelaxed_rank_*_*.pdb")
-            if len(alt_ranks) > 1:  # More than just rank_001
-                alternative_ranks[submission_id] = [os.path.basename(p) for p in alt_ranks]
-        
-    # Log results
-    logger.info(f"Found {len(missing_relaxed)} missing relaxed structures")
-    for submission_id in missing_relaxed:
-        if submission_id in alternative_ranks:
-            logger.info(f"Submission {submission_id} missing relaxed structure but has alternatives: {alternative_ranks[submission_id]}")
-        else:
-            logger.info(f"Submission {submission_id} missing relaxed structure with no alternatives")
-            
-    return missing_relaxed, alternative_ranks
+        full_dir = f"{data_path}/{dir}"
+        if not os.path.isdir(full_dir):
+            logger.warning(f"Structure directory does not exist: {full_dir}")
+            continue
+        with os.scandir(full_dir) as entries:
+            for entry in entries:
+                if _UNRELAXED_PDB_RE.match(entry.name):
+                    submission_id = entry.name.split('_unrelaxed')[0]
+                    by_submission.setdefault(submission_id, []).append(entry.name)
 
+    # One scandir pass over the relaxed directory instead of a stat()
+    # syscall per candidate file
+    relaxed_dir = f"{save_path}/relaxed"
+    relaxed_names = {entry.name for entry in os.scandir(relaxed_dir)} if os.path.isdir(relaxed_dir) else set()
 
-def check_missing_relaxed_structures(structure_dirs, save_path, data_path):
-    """Check for missing relaxed structures and available alternatives"""
-    logger.info("Checking for missing relaxed structures...")
+    for submission_id, names in sorted(by_submission.items()):
+        # Only submissions with a rank_001 prediction are considered
+        if not any(_RANK001_RE.match(name) for name in names):
+            continue
 
-    missing_relaxed = []
-    alternative_ranks = {}
-    
-    # Get all unrelaxed structures
-    unrelaxed_pdbs = []
-    for dir in structure_dirs:
-        unrelaxed_pdbs.extend(glob.glob(f"{data_path}/{dir}/*unrelaxed_rank_001_*.pdb"))
-    
-    # Check each unrelaxed structure
-    for pdb in unrelaxed_pdbs:
-        base_name = os.path.basename(pdb)
-        submission_id = base_name.split('_unrelaxed')[0]
-        
-        # Expected relaxed path
-        relaxed_dir = f"{save_path}/relaxed"
-        relaxed_pdb = os.path.join(relaxed_dir, f"{submission_id}.pdb") # different methods: either submission_id or submission_id_unrelaxed_rank_001_001.pdb
-        
-        if not os.path.exists(relaxed_pdb):
+        # different methods: either submission_id or submission_id_unrelaxed_rank_001_001.pdb
+        if f"{submission_id}.pdb" not in relaxed_names:
             missing_relaxed.append(submission_id)
-            
-            # Check for alternative ranks
-            base_dir = os.path.dirname(pdb)
-            alt_ranks = glob.glob(f"{base_dir}/{submission_id}_unrelaxed_rank_*_*.pdb")
-            if len(alt_ranks) > 1:  # More than just rank_001
-                alternative_ranks[submission_id] = [os.path.basename(p) for p in alt_ranks]
-        
+            if len(names) > 1:  # More than just rank_001
+                alternative_ranks[submission_id] = sorted(names)
+
     # Log results
     logger.info(f"Found {len(missing_relaxed)} missing relaxed structures")
     for submission_id in missing_relaxed:
@@ -101,5 +96,5 @@ def check_missing_relaxed_structures(structure_dirs, save_path, data_path):
             logger.info(f"Submission {submission_id} missing relaxed structure but has alternatives: {alternative_ranks[submission_id]}")
         else:
             logger.info(f"Submission {submission_id} missing relaxed structure with no alternatives")
-            
+
     return missing_relaxed, alternative_ranks
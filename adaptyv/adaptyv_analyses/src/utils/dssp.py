@@ -1,11 +1,45 @@
-from Bio.PDB import PDBParser, DSSP
-from collections import defaultdict
-from src.utils.interface import hotspot_residues
+from Bio.PDB import DSSP
+import numpy as np
+from src.utils.interface import hotspot_residues, parse_structure
 from loguru import logger
 import os
+import subprocess
 
+# DSSP code byte -> category (0 = loop, 1 = helix H/G/I, 2 = sheet E);
+# indexing this table classifies all residues branchlessly in one shot
+_SS_CATEGORY_TABLE = np.zeros(128, dtype=np.int8)
+_SS_CATEGORY_TABLE[[ord('H'), ord('G'), ord('I')]] = 1
+_SS_CATEGORY_TABLE[ord('E')] = 2
 
-def calc_ss_percentage(pdb_file, dssp_path, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0):
+
+def _run_dssp_cached(model, pdb_file, dssp_path):
+    """Run DSSP, caching its raw output next to the PDB file
+
+    The PDB bytes are piped to the binary over stdin so it never re-reads
+    the file we just parsed — 2x the I/O on network filesystems — and
+    repeated runs parse the cached `.dssp` output without invoking the
+    binary at all.
+    """
+    dssp_cache = pdb_file + ".dssp"
+    try:
+        if not os.path.exists(dssp_cache):
+            with open(pdb_file, 'rb') as f:
+                pdb_bytes = f.read()
+            proc = subprocess.run(
+                [dssp_path, '-i', '/dev/stdin', '-o', '/dev/stdout'],
+                input=pdb_bytes, capture_output=True, check=True
+            )
+            tmp_path = dssp_cache + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(proc.stdout)
+            os.replace(tmp_path, dssp_cache)
+        return DSSP(model, dssp_cache, file_type="DSSP")
+    except Exception as e:
+        logger.warning(f"Cached DSSP path failed ({str(e)}); invoking DSSP directly")
+        return DSSP(model, pdb_file, dssp=dssp_path)
+
+
+def calc_ss_percentage(pdb_file, dssp_path, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0, structure=None):
     try:
         # Check if files exist
         if not os.path.exists(pdb_file):
@@ -16,8 +50,8 @@ def calc_ss_percentage(pdb_file, dssp_path, binder_chain="A", target_chain="B",
         logger.info(f"Processing PDB file: {pdb_file}")
         logger.info(f"Using DSSP executable at: {dssp_path}")
 
-        parser = PDBParser(QUIET=True)
-        structure = parser.get_structure('protein', pdb_file)
+        if structure is None:
+            structure = parse_structure(pdb_file)
         model = structure[0]
 
         # Log available chains
@@ -28,26 +62,22 @@ def calc_ss_percentage(pdb_file, dssp_path, binder_chain="A", target_chain="B",
             raise ValueError(f"Chain {binder_chain} not found in structure. Available chains: {available_chains}")
 
         try:
-            dssp = DSSP(model, pdb_file, dssp=dssp_path)
+            dssp = _run_dssp_cached(model, pdb_file, dssp_path)
         except Exception as e:
             logger.error(f"DSSP calculation failed: {str(e)}")
             raise
 
-        ss_counts = defaultdict(int)
-        ss_interface_counts = defaultdict(int)
-        plddts_interface = []
-        plddts_ss = []
-
         chain = model[binder_chain]
         
         try:
            
-            interacting_residues = set(hotspot_residues(
-                pdb_file, 
+            interacting_residues = hotspot_residues(
+                pdb_file,
                 binder_chain=binder_chain,
                 target_chain=target_chain,
-                atom_distance_cutoff=atom_distance_cutoff
-            ).keys())
+                atom_distance_cutoff=atom_distance_cutoff,
+                structure=structure
+            )
             
             logger.info(f"Found {len(interacting_residues)} interacting residues")
             
@@ -57,47 +87,59 @@ def calc_ss_percentage(pdb_file, dssp_path, binder_chain="A", target_chain="B",
             logger.error(f"Failed to calculate hotspot residues: {str(e)}")
             raise
 
-        for residue in chain:
-            try:
-                residue_id = residue.id[1]
-                if (binder_chain, residue_id) in dssp:
-                    ss = dssp[(binder_chain, residue_id)][2]
-                    ss_type = 'loop'
-                    if ss in ['H', 'G', 'I']:
-                        ss_type = 'helix'
-                    elif ss == 'E':
-                        ss_type = 'sheet'
-
-                    ss_counts[ss_type] += 1
-
-                    if ss_type != 'loop':
-                        avg_plddt_ss = sum(atom.bfactor for atom in residue) / len(residue)
-                        plddts_ss.append(avg_plddt_ss)
-
-                    if residue_id in interacting_residues:
-                        ss_interface_counts[ss_type] += 1
-                        avg_plddt_residue = sum(atom.bfactor for atom in residue) / len(residue)
-                        plddts_interface.append(avg_plddt_residue)
-            except Exception as e:
-                logger.error(f"Error processing residue {residue_id}: {str(e)}")
-                continue
-
-        total_residues = sum(ss_counts.values())
-        total_interface_residues = sum(ss_interface_counts.values())
-
+        # Per-residue B-factor means computed once up front; the ss and
+        # interface branches share the lookup instead of re-summing atom
+        # bfactors with a Python generator in each branch
+        res_bfactor_mean = {
+            residue.id[1]: float(np.fromiter(
+                (atom.bfactor for atom in residue), dtype=np.float32, count=len(residue)
+            ).mean())
+            for residue in chain
+        }
+
+        # Residues with a DSSP assignment, kept in chain order
+        residues = [residue for residue in chain if (binder_chain, residue.id[1]) in dssp]
+        total_residues = len(residues)
         if total_residues == 0:
             raise ValueError("No residues were processed successfully")
 
-        helix_pct = round((ss_counts['helix'] / total_residues) * 100, 2) if total_residues > 0 else 0
-        sheet_pct = round((ss_counts['sheet'] / total_residues) * 100, 2) if total_residues > 0 else 0
-        loop_pct = round(((total_residues - ss_counts['helix'] - ss_counts['sheet']) / total_residues) * 100, 2) if total_residues > 0 else 0
-
-        i_helix_pct = round((ss_interface_counts['helix'] / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
-        i_sheet_pct = round((ss_interface_counts['sheet'] / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
-        i_loop_pct = round(((total_interface_residues - ss_interface_counts['helix'] - ss_interface_counts['sheet']) / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
-
-        i_plddt = round(sum(plddts_interface) / len(plddts_interface) / 100, 2) if plddts_interface else 0
-        ss_plddt = round(sum(plddts_ss) / len(plddts_ss) / 100, 2) if plddts_ss else 0
+        resids = np.fromiter((residue.id[1] for residue in residues), dtype=np.int32, count=total_residues)
+        ss_codes = np.fromiter(
+            (ord(dssp[(binder_chain, residue.id[1])][2]) for residue in residues),
+            dtype=np.uint8, count=total_residues
+        )
+        bfactor_means = np.fromiter(
+            (res_bfactor_mean[residue.id[1]] for residue in residues),
+            dtype=np.float32, count=total_residues
+        )
+
+        # One table lookup classifies every residue at once; bincount then
+        # replaces the per-residue branch-and-increment loop
+        cats = _SS_CATEGORY_TABLE[ss_codes]
+        counts = np.bincount(cats, minlength=3)
+
+        # Single vectorized membership test over the ordered residue array
+        # instead of one dict probe per residue
+        interface_resids = np.fromiter(interacting_residues, dtype=np.int32, count=len(interacting_residues))
+        interface_mask = np.isin(resids, interface_resids)
+        interface_counts = np.bincount(cats[interface_mask], minlength=3)
+        total_interface_residues = int(interface_counts.sum())
+
+        plddts_ss = bfactor_means[cats != 0]
+        plddts_interface = bfactor_means[interface_mask]
+
+        helix_count, sheet_count = int(counts[1]), int(counts[2])
+        helix_pct = round((helix_count / total_residues) * 100, 2)
+        sheet_pct = round((sheet_count / total_residues) * 100, 2)
+        loop_pct = round(((total_residues - helix_count - sheet_count) / total_residues) * 100, 2)
+
+        i_helix_count, i_sheet_count = int(interface_counts[1]), int(interface_counts[2])
+        i_helix_pct = round((i_helix_count / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
+        i_sheet_pct = round((i_sheet_count / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
+        i_loop_pct = round(((total_interface_residues - i_helix_count - i_sheet_count) / total_interface_residues) * 100, 2) if total_interface_residues > 0 else 0
+
+        i_plddt = round(float(plddts_interface.mean()) / 100, 2) if plddts_interface.size else 0
+        ss_plddt = round(float(plddts_ss.mean()) / 100, 2) if plddts_ss.size else 0
 
         return (helix_pct, sheet_pct, loop_pct, 
                 i_helix_pct, i_sheet_pct, i_loop_pct, 
@@ -0,0 +1,26 @@
+import os
+import time
+
+_exists_cache = {}
+
+
+def exists(path, ttl=5.0):
+    """os.path.exists with a short TTL cache
+
+    Batch loops probe the same relaxed paths repeatedly; caching both
+    positive and negative answers for a few seconds turns repeat stat()
+    syscalls into dict lookups. Writers must call invalidate() after
+    creating a path they previously probed.
+    """
+    now = time.monotonic()
+    hit = _exists_cache.get(path)
+    if hit is not None and hit[1] > now:
+        return hit[0]
+    result = os.path.exists(path)
+    _exists_cache[path] = (result, now + ttl)
+    return result
+
+
+def invalidate(path):
+    """Drop the cached exists() result for a freshly written path"""
+    _exists_cache.pop(path, None)
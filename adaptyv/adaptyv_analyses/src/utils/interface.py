@@ -1,3 +1,6 @@
+import os
+from functools import lru_cache
+
 import numpy as np
 from Bio.PDB import PDBParser, Selection
 from scipy.spatial import cKDTree
@@ -5,12 +8,64 @@ from loguru import logger
 from src.utils.constants import THREE_TO_ONE_MAP
 
 
-def hotspot_residues(trajectory_pdb, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0):
-    """Analyze interface residues with detailed logging"""
+@lru_cache(maxsize=64)
+def _parse_structure(pdb_path, mtime):
+    """Parse a PDB file, memoized per (path, mtime)
+
+    The mtime key invalidates the cache whenever the file is rewritten, so
+    repeated analyses of the same structure skip the text parse entirely.
+    """
+    return PDBParser(QUIET=True).get_structure("complex", pdb_path)
+
+
+def parse_structure(pdb_path):
+    """Return the cached parsed structure for a PDB path"""
+    return _parse_structure(pdb_path, os.path.getmtime(pdb_path))
+
+
+def _atom_coords(atoms):
+    """Copy atom coordinates into a single preallocated float32 array
+
+    One allocation plus row assignments instead of building N tiny arrays;
+    float32 is plenty for a 4 A cutoff and keeps the KDTree nodes narrower.
+    """
+    coords = np.empty((len(atoms), 3), dtype=np.float32)
+    for i, atom in enumerate(atoms):
+        coords[i] = atom.coord
+    return coords
+
+
+def _contact_pairs(binder_coords, target_coords, cutoff):
+    """Return (binder_idx, target_idx) arrays of atom pairs within cutoff
+
+    Builds one KDTree on the larger point set and queries it with the
+    smaller one — tree construction dominates for these point counts, so
+    this halves it versus two trees plus query_ball_tree. workers=-1
+    parallelizes the query across cores.
+    """
+    if len(target_coords) >= len(binder_coords):
+        tree = cKDTree(target_coords)
+        hits = tree.query_ball_point(binder_coords, cutoff, workers=-1)
+        binder_idx = np.repeat(np.arange(len(binder_coords)), [len(h) for h in hits])
+        target_idx = np.fromiter((i for h in hits for i in h), dtype=np.intp, count=len(binder_idx))
+    else:
+        tree = cKDTree(binder_coords)
+        hits = tree.query_ball_point(target_coords, cutoff, workers=-1)
+        target_idx = np.repeat(np.arange(len(target_coords)), [len(h) for h in hits])
+        binder_idx = np.fromiter((i for h in hits for i in h), dtype=np.intp, count=len(target_idx))
+    return binder_idx, target_idx
+
+
+def hotspot_residues(trajectory_pdb, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0, structure=None):
+    """Analyze interface residues with detailed logging
+
+    Accepts an already-parsed Bio.PDB structure so callers that run several
+    analyses on the same file only pay for one parse.
+    """
     try:
-        parser = PDBParser(QUIET=True)
-        structure = parser.get_structure("complex", trajectory_pdb)
-        
+        if structure is None:
+            structure = parse_structure(trajectory_pdb)
+
         # Check if chains exist
         if binder_chain not in structure[0]:
             raise ValueError(f"Binder chain '{binder_chain}' not found in structure")
@@ -25,25 +80,34 @@ def hotspot_residues(trajectory_pdb, binder_chain="A", target_chain="B", atom_di
         if not target_atoms:
             raise ValueError(f"No atoms found in target chain {target_chain}")
 
-        binder_coords = np.array([atom.coord for atom in binder_atoms])
-        target_coords = np.array([atom.coord for atom in target_atoms])
+        binder_coords = _atom_coords(binder_atoms)
+        target_coords = _atom_coords(target_atoms)
 
-        binder_tree = cKDTree(binder_coords)
-        target_tree = cKDTree(target_coords)
+        # Bounding-box short circuit: when the chains' boxes are separated
+        # by more than the cutoff, no contact is possible and the KDTree
+        # build is pure waste
+        bmin, bmax = binder_coords.min(axis=0), binder_coords.max(axis=0)
+        tmin, tmax = target_coords.min(axis=0), target_coords.max(axis=0)
+        if np.any(bmin - tmax > atom_distance_cutoff) or np.any(tmin - bmax > atom_distance_cutoff):
+            logger.debug("Chains separated beyond the contact cutoff; no interface residues")
+            return {}
 
-        interacting_residues = {}
-        pairs = binder_tree.query_ball_tree(target_tree, atom_distance_cutoff)
+        # Atom contact pairs + one vectorized reduction by residue index
+        # instead of iterating a Python list-of-lists of atom pairs
+        pair_binder_idx, _ = _contact_pairs(binder_coords, target_coords, atom_distance_cutoff)
+        binder_residx = np.fromiter(
+            (atom.get_parent().id[1] for atom in binder_atoms),
+            dtype=np.int32, count=len(binder_atoms)
+        )
+        hit_resids = set(np.unique(binder_residx[pair_binder_idx]).tolist())
+        logger.debug(f"Found {len(pair_binder_idx)} atom contacts")
 
-        logger.debug(f"Processing {len(pairs)} potential interactions")
-        
-        for binder_idx, close_indices in enumerate(pairs):
-            binder_residue = binder_atoms[binder_idx].get_parent()
-            binder_resname = binder_residue.get_resname()
-            if binder_resname in THREE_TO_ONE_MAP:
-                aa_single_letter = THREE_TO_ONE_MAP[binder_resname]
-                if close_indices:  
-                    logger.debug(f"Binder residue {binder_residue.id[1]} ({binder_resname}) has {len(close_indices)} contacts")
-                    interacting_residues[binder_residue.id[1]] = aa_single_letter
+        interacting_residues = {}
+        for residue in structure[0][binder_chain]:
+            if residue.id[1] in hit_resids:
+                resname = residue.get_resname()
+                if resname in THREE_TO_ONE_MAP:
+                    interacting_residues[residue.id[1]] = THREE_TO_ONE_MAP[resname]
 
         logger.debug(f"Found {len(interacting_residues)} interface residues: {sorted(interacting_residues.keys())}")
         return interacting_residues
@@ -52,49 +116,58 @@ def hotspot_residues(trajectory_pdb, binder_chain="A", target_chain="B", atom_di
         logger.error(f"Error in hotspot_residues: {str(e)}")
         raise  # Re-raise the exception with proper context
 
-def analyze_interface_contacts(pdb_file, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0):
+def analyze_interface_contacts(pdb_file, binder_chain="A", target_chain="B", atom_distance_cutoff=4.0, structure=None):
     """Analyze interface contacts using KDTree"""
     try:
         logger.info(f"Analyzing interface contacts for {pdb_file}")
-        parser = PDBParser(QUIET=True)
-        structure = parser.get_structure("complex", pdb_file)
+        if structure is None:
+            structure = parse_structure(pdb_file)
 
         binder_atoms = Selection.unfold_entities(structure[0][binder_chain], 'A')
-        binder_coords = np.array([atom.coord for atom in binder_atoms])
+        binder_coords = _atom_coords(binder_atoms)
 
         target_atoms = Selection.unfold_entities(structure[0][target_chain], 'A')
-        target_coords = np.array([atom.coord for atom in target_atoms])
+        target_coords = _atom_coords(target_atoms)
 
-        binder_tree = cKDTree(binder_coords)
-        target_tree = cKDTree(target_coords)
+        # Atom contact pairs reduced by residue index in numpy rather than
+        # nested Python loops over every contacting atom pair
+        pair_binder_idx, pair_target_idx = _contact_pairs(binder_coords, target_coords, atom_distance_cutoff)
+        atom_contacts = int(len(pair_binder_idx))
 
-        pairs = binder_tree.query_ball_tree(target_tree, atom_distance_cutoff)
-        
-        binder_residues = {}
-        target_residues = {}
-        target_residue_indices = set()
-        
-        atom_contacts = sum(len(close_indices) for close_indices in pairs)
-        
-        for binder_idx, close_indices in enumerate(pairs):
-            if close_indices:
-                binder_residue = binder_atoms[binder_idx].get_parent()
-                binder_resname = binder_residue.get_resname()
-                
-                if binder_resname in THREE_TO_ONE_MAP:
-                    aa_single_letter = THREE_TO_ONE_MAP[binder_resname]
-                    binder_residues[binder_residue.id[1]] = aa_single_letter
-                    
-                    for close_idx in close_indices:
-                        target_residue = target_atoms[close_idx].get_parent()
-                        target_resname = target_residue.get_resname()
-                        if target_resname in THREE_TO_ONE_MAP:
-                            target_aa = THREE_TO_ONE_MAP[target_resname]
-                            target_residues[target_residue.id[1]] = target_aa
-                            target_residue_indices.add(target_residue.id[1])
-
-        target_residue_list = sorted(list(target_residue_indices))
-        binder_residue_list = sorted(list(binder_residues.keys()))
+        binder_residx = np.fromiter(
+            (atom.get_parent().id[1] for atom in binder_atoms),
+            dtype=np.int32, count=len(binder_atoms)
+        )
+        target_residx = np.fromiter(
+            (atom.get_parent().id[1] for atom in target_atoms),
+            dtype=np.int32, count=len(target_atoms)
+        )
+        binder_atom_valid = np.fromiter(
+            (atom.get_parent().get_resname() in THREE_TO_ONE_MAP for atom in binder_atoms),
+            dtype=bool, count=len(binder_atoms)
+        )
+
+        binder_res_map = {
+            residue.id[1]: THREE_TO_ONE_MAP[residue.get_resname()]
+            for residue in structure[0][binder_chain]
+            if residue.get_resname() in THREE_TO_ONE_MAP
+        }
+        target_res_map = {
+            residue.id[1]: THREE_TO_ONE_MAP[residue.get_resname()]
+            for residue in structure[0][target_chain]
+            if residue.get_resname() in THREE_TO_ONE_MAP
+        }
+
+        hit_binder = np.unique(binder_residx[pair_binder_idx])
+        binder_residues = {int(rid): binder_res_map[rid] for rid in hit_binder if rid in binder_res_map}
+
+        # Original semantics: target residues only count when reached through
+        # a binder atom whose residue is a standard amino acid
+        hit_target = np.unique(target_residx[pair_target_idx[binder_atom_valid[pair_binder_idx]]])
+        target_residues = {int(rid): target_res_map[rid] for rid in hit_target if rid in target_res_map}
+
+        target_residue_list = sorted(target_residues.keys())
+        binder_residue_list = sorted(binder_residues.keys())
         total_interface_residues = len(binder_residues) + len(target_residues)
         
         return {
@@ -1,19 +1,40 @@
+import mmap
 import os
+import re
+import shutil
+
+# Compiled once; scans the mapped file at C level instead of building a
+# Python string object per line
+_KEEP_LINE_RE = re.compile(rb'(?m)^(?:ATOM|HETATM|MODEL|TER|END)[^\n]*\n?')
 
 def clean_pdb(pdb_file):
     """Clean PDB file to keep only relevant lines"""
-    with open(pdb_file, 'r') as f_in:
-        relevant_lines = [line for line in f_in if line.startswith(('ATOM', 'HETATM', 'MODEL', 'TER', 'END'))]
-    
-    with open(pdb_file, 'w') as f_out:
+    if os.path.getsize(pdb_file) == 0:
+        return
+
+    with open(pdb_file, 'rb') as f_in:
+        with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            relevant_lines = [m.group(0) for m in _KEEP_LINE_RE.finditer(mm)]
+            # Nothing filtered: skip the rewrite entirely
+            if sum(len(line) for line in relevant_lines) == len(mm):
+                return
+
+    tmp_path = pdb_file + '.tmp'
+    with open(tmp_path, 'wb') as f_out:
         f_out.writelines(relevant_lines)
+    os.replace(tmp_path, pdb_file)
 
 def add_cryst1_record(pdb_file):
     """Add CRYST1 record to PDB file if missing"""
-    with open(pdb_file, 'r') as f:
-        content = f.read()
-    
-    if not content.startswith('CRYST1'):
-        cryst1_record = "CRYST1    1.000    1.000    1.000  90.00  90.00  90.00 P 1           1\n"
-        with open(pdb_file, 'w') as f:
-            f.write(cryst1_record + content)
+    # Only the first six bytes decide anything; peek instead of reading
+    # the whole file into memory
+    with open(pdb_file, 'rb') as f:
+        if f.read(6) == b'CRYST1':
+            return
+
+    cryst1_record = b"CRYST1    1.000    1.000    1.000  90.00  90.00  90.00 P 1           1\n"
+    tmp_path = pdb_file + '.tmp'
+    with open(pdb_file, 'rb') as f_in, open(tmp_path, 'wb') as f_out:
+        f_out.write(cryst1_record)
+        shutil.copyfileobj(f_in, f_out, 64 * 1024)
+    os.replace(tmp_path, pdb_file)
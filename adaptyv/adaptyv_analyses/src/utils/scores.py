@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from loguru import logger
 import pyrosetta as pr
 from pyrosetta.rosetta.protocols.analysis import InterfaceAnalyzerMover
@@ -12,11 +13,34 @@ from src.setup.pyrosetta import initialize_pyrosetta
 
 import math
 
+# Hoisted to module scope so score_interface doesn't rebuild them per call
+_INTERFACE_AA_TEMPLATE = dict.fromkeys('ACDEFGHIKLMNPQRSTVWY', 0)
+_HYDROPHOBIC_AA = frozenset('ACFILMPVWY')
+
+_BUNS_FILTER_XML = '<BuriedUnsatHbonds report_all_heavy_atom_unsats="true" scorefxn="scorefxn" ignore_surface_res="false" use_ddG_style="true" dalphaball_sasa="1" probe_radius="1.1" burial_cutoff_apo="0.2" confidence="0" />'
+
+
+@lru_cache(maxsize=None)
+def _get_scorefxn():
+    """Full-atom score function, built once per process
+
+    Score function construction is one of the costlier Rosetta setup steps
+    and is identical for every scored file.
+    """
+    return pr.get_fa_scorefxn()
+
+
+@lru_cache(maxsize=None)
+def _get_buns_filter(xml):
+    """BuriedUnsatHbonds filter parsed from its XML once per parameterization"""
+    return XmlObjects.static_get_filter(xml)
+
+
+def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/root/competition_vol", pose=None, structure=None):
 
-def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/root/competition_vol"):
-    
     try:
-        pose = pr.pose_from_pdb(pdb_file)
+        if pose is None:
+            pose = pr.pose_from_pdb(pdb_file)
         logger.info(f"Loaded pose with {pose.total_residue()} residues")
     except Exception as e:
         logger.error(f"Failed to load pose: {str(e)}")
@@ -26,7 +50,7 @@ def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/ro
     logger.info("Setting up InterfaceAnalyzerMover")
     iam = InterfaceAnalyzerMover()
     iam.set_interface("A_B")
-    scorefxn = pr.get_fa_scorefxn()
+    scorefxn = _get_scorefxn()
     iam.set_scorefunction(scorefxn)
     iam.set_compute_packstat(True)
     iam.set_compute_interface_energy(True)
@@ -40,8 +64,8 @@ def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/ro
     logger.info("Successfully applied InterfaceAnalyzerMover")
 
     # Initialize dictionary with all amino acids
-    interface_AA = {aa: 0 for aa in 'ACDEFGHIKLMNPQRSTVWY'}
-    interface_residues_set = hotspot_residues(pdb_file, binder_chain = binder_chain, target_chain = target_chain)
+    interface_AA = dict(_INTERFACE_AA_TEMPLATE)
+    interface_residues_set = hotspot_residues(pdb_file, binder_chain = binder_chain, target_chain = target_chain, structure = structure)
     logger.info(f"Found {len(interface_residues_set)} interface residues")
     
     interface_residues_pdb_ids = []
@@ -59,8 +83,7 @@ def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/ro
 
     # Calculate hydrophobicity
     logger.info("Calculating interface hydrophobicity")
-    hydrophobic_aa = set('ACFILMPVWY')
-    hydrophobic_count = sum(interface_AA[aa] for aa in hydrophobic_aa)
+    hydrophobic_count = sum(interface_AA[aa] for aa in _HYDROPHOBIC_AA)
     interface_hydrophobicity = (hydrophobic_count / interface_nres) * 100 if interface_nres != 0 else 0
     logger.info(f"Interface hydrophobicity: {interface_hydrophobicity}%")
 
@@ -113,7 +136,7 @@ def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/ro
 
     # Calculate buried unsatisfied H-bonds
     try:
-        buns_filter = XmlObjects.static_get_filter('<BuriedUnsatHbonds report_all_heavy_atom_unsats="true" scorefxn="scorefxn" ignore_surface_res="false" use_ddG_style="true" dalphaball_sasa="1" probe_radius="1.1" burial_cutoff_apo="0.2" confidence="0" />')
+        buns_filter = _get_buns_filter(_BUNS_FILTER_XML)
         interface_delta_unsat_hbonds = buns_filter.report_sm(pose)
         logger.info(f"Found {interface_delta_unsat_hbonds} buried unsatisfied H-bonds")
     except Exception as e:
@@ -150,8 +173,15 @@ def score_interface(pdb_file, binder_chain="A", target_chain="B", save_path="/ro
     # calculate surface hydrophobicity
     logger.info("Calculating surface hydrophobicity")
     try:
-        binder_pose = {pose.pdb_info().chain(pose.conformation().chain_begin(i)): p 
-                        for i, p in zip(range(1, pose.num_chains()+1), pose.split_by_chain())}[binder_chain]
+        # Extract just the binder chain by index; split_by_chain() with no
+        # argument deep-copies every chain only to pick one afterwards
+        pdb_info = pose.pdb_info()
+        conformation = pose.conformation()
+        binder_chain_idx = next(
+            i for i in range(1, pose.num_chains() + 1)
+            if pdb_info.chain(conformation.chain_begin(i)) == binder_chain
+        )
+        binder_pose = pose.split_by_chain(binder_chain_idx)
         logger.info("Successfully split chains")
     except Exception as e:
         logger.error(f"Error splitting chains: {str(e)}")
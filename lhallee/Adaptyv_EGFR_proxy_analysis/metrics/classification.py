@@ -1,13 +1,7 @@
 import numpy as np
-import torch
 from transformers import EvalPrediction
 from sklearn.metrics import (
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
     confusion_matrix,
-    matthews_corrcoef,
     roc_auc_score
 )
 from sklearn.preprocessing import label_binarize
@@ -38,59 +32,81 @@ def compute_metrics_single_label_classification(p: EvalPrediction):
     preds = p.predictions[0] if isinstance(p.predictions, tuple) else p.predictions
     labels = p.label_ids[1] if isinstance(p.label_ids, tuple) else p.label_ids
 
-    preds = torch.tensor(np.array(preds))
-    y_true = torch.tensor(np.array(labels), dtype=torch.int)
+    # Stay in numpy end to end: the old torch.tensor(np.array(...)) round
+    # trip copied the predictions twice before copying them back out
+    preds = np.asarray(preds)
+    y_true = np.asarray(labels).astype(np.int64)
 
-    if y_true.size() == preds.size():
-        y_pred = (preds > 0.5).int().flatten()
+    if y_true.shape == preds.shape:
+        y_pred = (preds > 0.5).astype(np.int8).ravel()
         n_classes = 2
         probs = None
     else:
         n_classes = preds.shape[-1]
-        y_pred = preds.argmax(dim=-1).flatten()
-        probs = y_pred.clone()
+        y_pred = preds.argmax(axis=-1).ravel()
+        # Real class probabilities for AUC — the old argmax copy made the
+        # multiclass AUC degenerate. Softmax since preds may be logits
+        shifted = preds.reshape(-1, n_classes) - preds.reshape(-1, n_classes).max(axis=-1, keepdims=True)
+        probs = np.exp(shifted)
+        probs /= probs.sum(axis=-1, keepdims=True)
 
     all_classes = np.arange(n_classes)
 
-    y_true = y_true.flatten()
+    y_true = y_true.ravel()
 
     valid_indices = y_true != -100
 
     y_pred = y_pred[valid_indices]
     y_true = y_true[valid_indices]
+    if probs is not None:
+        probs = probs[valid_indices]
 
-    # Convert to numpy for sklearn metrics
-    y_true_np = y_true.numpy()
-    y_pred_np = y_pred.numpy()
-
-    cm = confusion_matrix(y_true_np, y_pred_np, labels=all_classes)
+    cm = confusion_matrix(y_true, y_pred, labels=all_classes)
     print("\nConfusion Matrix:")
     print(cm)
 
-    f1 = f1_score(y_true_np, y_pred_np, average='weighted', labels=all_classes, zero_division=0)
-    precision = precision_score(y_true_np, y_pred_np, average='weighted', labels=all_classes, zero_division=0)
-    recall = recall_score(y_true_np, y_pred_np, average='weighted', labels=all_classes, zero_division=0)
-    accuracy = accuracy_score(y_true_np, y_pred_np)
-    mcc = matthews_corrcoef(y_true_np, y_pred_np)
-    
-    # AUC calculation
-    if probs != None:
-        probs_np = probs.numpy()
-        if n_classes == 2:  # Binary classification
-            try:
-                auc = roc_auc_score(y_true_np, y_pred_np)
-            except:
-                auc = -100
-        else:  # Multiclass classification
-            # Binarize the true labels
-            y_true_bin = label_binarize(y_true_np, classes=all_classes)
-            # Compute AUC for each class
-            try:
-                auc = roc_auc_score(y_true_bin, probs_np, average='weighted', multi_class='ovr')
-            except:
-                auc = -100
-    else:
+    # Derive every scalar metric from the one contingency table instead of
+    # letting each sklearn wrapper rescan the full prediction arrays
+    cm_f = cm.astype(np.float64)
+    tp = np.diag(cm_f)
+    support = cm_f.sum(axis=1)
+    pred_pos = cm_f.sum(axis=0)
+    total = cm_f.sum()
+
+    precision_per = np.where(pred_pos > 0, tp / np.maximum(pred_pos, 1), 0.0)
+    recall_per = np.where(support > 0, tp / np.maximum(support, 1), 0.0)
+    pr_sum = precision_per + recall_per
+    f1_per = np.where(pr_sum > 0, 2 * precision_per * recall_per / np.maximum(pr_sum, 1e-12), 0.0)
+
+    weights = support / total
+    f1 = float(np.dot(f1_per, weights))
+    precision = float(np.dot(precision_per, weights))
+    recall = float(np.dot(recall_per, weights))
+    accuracy = float(tp.sum() / total)
+
+    # Multiclass MCC via the closed-form trace formula on the same table
+    mcc_num = tp.sum() * total - np.dot(support, pred_pos)
+    mcc_den = np.sqrt((total * total - np.dot(pred_pos, pred_pos)) * (total * total - np.dot(support, support)))
+    mcc = float(mcc_num / mcc_den) if mcc_den > 0 else 0.0
+
+
+    # AUC calculation: bail out first when there are no probabilities so
+    # the binarization work only happens on the path that uses it
+    if probs is None:
         auc = -100
+    elif n_classes == 2:  # Binary classification
+        try:
+            auc = roc_auc_score(y_true, y_pred)
+        except:
+            auc = -100
+    else:  # Multiclass classification
+        # Binarize the true labels
+        y_true_bin = label_binarize(y_true, classes=all_classes)
+        # Compute AUC for each class
+        try:
+            auc = roc_auc_score(y_true_bin, probs, average='weighted', multi_class='ovr')
+        except:
+            auc = -100
 
     return {
         'f1': round(f1, 5),
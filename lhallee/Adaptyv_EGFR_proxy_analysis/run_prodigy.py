@@ -1,56 +1,59 @@
-import subprocess
 import os
 import pandas as pd
-import re
 import numpy as np
 from glob import glob
 from tqdm.auto import tqdm
 from Bio.PDB import PDBParser
-from Bio.PDB.Polypeptide import PPBuilder
 from Bio.PDB.MMCIFParser import MMCIFParser
+from Bio.Data.IUPACData import protein_letters_3to1
 from concurrent.futures import ProcessPoolExecutor
 
+from prodigy_local.modules.prodigy import Prodigy
+
+
+# Sequence extraction only needs residue names, so a direct three-to-one
+# lookup replaces PPBuilder's distance-based peptide construction
+_THREE_TO_ONE = {name.upper(): letter for name, letter in protein_letters_3to1.items()}
+
+# The parsers are stateless across files, so build them once per worker
+# process instead of once per structure
+_pdb_parser = None
+_cif_parser = None
+
+
+def _init_worker():
+    global _pdb_parser, _cif_parser
+    _pdb_parser = PDBParser(QUIET=True)
+    _cif_parser = MMCIFParser(QUIET=True)
+
+
+def _chain_sequence(chain) -> str:
+    return ''.join([_THREE_TO_ONE[res.resname] for res in chain if res.resname in _THREE_TO_ONE])
+
 
 def process_structure(file: str) -> tuple:
-    """Run prodigy on a single PDB file and extract sequences.
+    """Run prodigy on a single structure file and extract sequences.
 
-    Returns a tuple: (SeqA, SeqB, kd)
+    Returns a tuple: (SeqA, SeqB, pkd)
     """
-    # Always normalize to forward slashes for subprocess arg
+    # Always normalize to forward slashes
     file = file.replace('\\', '/')
 
-    # Run prodigy CLI as a subprocess
-    env = os.environ.copy()
-    # Force UTF-8 for child process so prints/logging are encodable
-    env["PYTHONIOENCODING"] = "utf-8"
-    result = subprocess.run(
-        ["py", "-m", "prodigy_local.cli", file],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,  # merge stderr into stdout to avoid missing lines
-        text=True,
-        encoding="utf-8",
-        errors="replace",  # avoid decode failures on special characters
-        env=env,
-    )
-    output_str = result.stdout
-
-    # Extract KD robustly; ignore degree symbol variations and whitespace
-    # Example line:
-    # [++] predicted dissociation constant (M) at 25.0˚C:  1.23e-06
-    m = re.search(r"dissociation constant \(M\) at\s*[0-9.]+[^\n]*C:\s*([0-9.eE+-]+)", output_str)
-    if not m:
-        raise ValueError(f"Could not parse KD from prodigy output for {file}.\nOutput was:\n{output_str}")
-    kd = float(m.group(1))
-    pkd = -np.log10(kd)
-    # Parse sequences from structure file (PDB or mmCIF)
-    parser = MMCIFParser() if file.lower().endswith('.cif') else PDBParser(QUIET=True)
-    ppb = PPBuilder()
+    # Call prodigy in-process: the old subprocess spawned a fresh
+    # interpreter per file and re-parsed the structure a second time just
+    # to scrape the KD back out of the printed output
+    parser = _cif_parser if file.lower().endswith('.cif') else _pdb_parser
     structure = parser.get_structure('structure', file)
-    chains = list(structure.get_chains())
-    
-    # Extract sequences from first two chains using PPBuilder
-    seq_a = ''.join([str(pp.get_sequence()) for pp in ppb.build_peptides(chains[0])])
-    seq_b = ''.join([str(pp.get_sequence()) for pp in ppb.build_peptides(chains[1])])
+    model = next(structure.get_models())
+
+    prodigy = Prodigy(model=model, name=file)
+    prodigy.predict()
+    pkd = -np.log10(prodigy.kd_val)
+
+    # Extract sequences from first two chains by residue name
+    chains = list(model.get_chains())
+    seq_a = _chain_sequence(chains[0])
+    seq_b = _chain_sequence(chains[1])
 
     return (seq_a, seq_b, pkd)
 
@@ -68,11 +71,14 @@ if __name__ == "__main__":
     # Choose a reasonable number of workers
     max_workers = max(1, os.cpu_count() - 2)
     for name, files in file_dict.items():
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # executor.map preserves input order
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            # executor.map preserves input order. Chunking amortizes the
+            # pickling round trip per task; ~4 chunks per worker keeps the
+            # tail balanced when some structures are slower than others
+            chunksize = max(1, len(files) // (max_workers * 4))
             ordered_results = list(
                 tqdm(
-                    executor.map(process_structure, files, chunksize=1),
+                    executor.map(process_structure, files, chunksize=chunksize),
                     total=len(files)
                 )
             )
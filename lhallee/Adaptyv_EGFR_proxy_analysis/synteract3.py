@@ -10,6 +10,7 @@ If you'd like access to it, please Synthyra at info@synthyra.com
 """
 
 DATA_DIR = 'data'
+BATCH_SIZE = 16
 MODEL_DICT = {
     'synteract3_human': "Synthyra/###",
     'synteract3_multi': "Synthyra/###",
@@ -25,12 +26,22 @@ if __name__ == "__main__":
         model = AutoModel.from_pretrained(model_path, trust_remote_code=True)
         model = model.eval().to(device)
 
-        synteract_probs = []
-        for seqa, seqb in tqdm(zip(df['SeqA'].tolist(), df['SeqB'].tolist()), total=len(df), desc=model_name):
-            prob_ab = model.get_ppi_logits(seqa, seqb).detach().cpu().item()
-            prob_ba = model.get_ppi_logits(seqb, seqa).detach().cpu().item()
-            prob = (prob_ab + prob_ba) / 2
-            synteract_probs.append(prob)
+        pairs = list(zip(df['SeqA'].tolist(), df['SeqB'].tolist()))
+        # Length-bucket so each batch pads to similar lengths
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+
+        synteract_probs = [0.0] * len(pairs)
+        with torch.no_grad():
+            for start in tqdm(range(0, len(order), BATCH_SIZE), desc=model_name):
+                idx = order[start:start + BATCH_SIZE]
+                seqs_a = [pairs[i][0] for i in idx]
+                seqs_b = [pairs[i][1] for i in idx]
+                # One forward over AB and BA stacked; average the two
+                # directions on-device and move to host once per batch
+                logits = model.get_ppi_logits(seqs_a + seqs_b, seqs_b + seqs_a)
+                probs = ((logits[:len(idx)] + logits[len(idx):]) / 2).flatten().cpu().tolist()
+                for i, prob in zip(idx, probs):
+                    synteract_probs[i] = prob
 
         df[model_name] = synteract_probs
 
@@ -4,35 +4,72 @@ import io
 import csv
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, List, Dict
 
 
-def convert_data_to_csv_bytes(data: List[Dict[str, str]], task_type: str) -> bytes:
+# One pooled session for the whole module: TCP + TLS handshakes are
+# reused across submissions and polls, and the pool is sized for the
+# threaded multi-target path
+_SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+
+def _iter_csv_rows(data: List[Dict[str, str]], task_type: str):
     """
-    Convert data to CSV format in memory as bytes.
-    
+    Yield the upload CSV row by row as UTF-8 bytes.
+
     Args:
         data: List of dictionaries containing the sequences
         task_type: The type of task ('ppi' or 'annotation')
-        
-    Returns:
-        CSV data as bytes
     """
-    output = io.StringIO()
-    
+    # Positional rows skip DictWriter's per-row field lookup and ordering
     if task_type == 'ppi':
         fieldnames = ['SeqA', 'SeqB']
+        rows = ((item['SeqA'], item['SeqB']) for item in data)
     else:  # annotation
         fieldnames = ['seq']
-        
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    
-    for item in data:
-        writer.writerow(item)
-    
-    return output.getvalue().encode('utf-8')
+        rows = ((item['seq'],) for item in data)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    yield buffer.getvalue().encode('utf-8')
+
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _CsvStream:
+    """
+    Minimal file-like view over an encoded row generator, so requests can
+    consume the upload incrementally instead of the old StringIO path that
+    held the full CSV in memory twice (text plus encoded copy).
+    """
+    def __init__(self, rows):
+        self._rows = rows
+        self._pending = b''
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._pending]
+        total = len(self._pending)
+        for row in self._rows:
+            chunks.append(row)
+            total += len(row)
+            if size >= 0 and total >= size:
+                break
+        buffer = b''.join(chunks)
+        if size < 0 or len(buffer) <= size:
+            self._pending = b''
+            return buffer
+        self._pending = buffer[size:]
+        return buffer[:size]
 
 
 def send_request(data: List[Dict[str, str]], task_type: str, api_key: str = None) -> Optional[float]:
@@ -48,11 +85,9 @@ def send_request(data: List[Dict[str, str]], task_type: str, api_key: str = None
         Elapsed time in seconds, or None if the test failed
     """
     
-    # Convert data to CSV bytes
-    csv_bytes = convert_data_to_csv_bytes(data, task_type)
-    
+    # Stream the CSV encoding into the upload instead of materializing it
     files = {
-        'file': ('input.csv', csv_bytes),
+        'file': ('input.csv', _CsvStream(_iter_csv_rows(data, task_type))),
     }
     name = f'api_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
     if task_type == 'ppi':
@@ -69,7 +104,7 @@ def send_request(data: List[Dict[str, str]], task_type: str, api_key: str = None
         'api_key': api_key
     }
 
-    response = requests.post(
+    response = _SESSION.post(
         f'https://api.synthyra.com/v1/generate/{task_type}',
         params=params,
         files=files,
@@ -84,20 +119,26 @@ def send_request(data: List[Dict[str, str]], task_type: str, api_key: str = None
         return None
 
 
+    # Exponential backoff: short jobs finish within a poll or two instead
+    # of idling out a fixed 10s sleep, long jobs settle at a 30s cadence
+    delay = 0.5
     while True:
         params = {'job_id': job_id, 'api_key': api_key}
-        response = requests.get('https://api.synthyra.com/v1/job', params=params)
-        
-        try:
+        # stream=True lets the completed CSV be parsed straight off the
+        # socket instead of buffering response.text plus a StringIO copy
+        response = _SESSION.get('https://api.synthyra.com/v1/job', params=params, stream=True)
+
+        if 'json' in response.headers.get('Content-Type', ''):
             status = response.json()
             print(f'\nRunning... {status}')
-        except:
-            output = io.StringIO(response.text)
-            df = pd.read_csv(output)
+        else:
+            response.raw.decode_content = True
+            df = pd.read_csv(response.raw)
             print(df.head())
             print(f"Job completed in {time.time() - start_time} seconds")
             return df
-        time.sleep(10)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 30.0)
 
 
 def predict_against_target(target: str, designs: List[str], test: bool = False, api_key: str = None) -> pd.DataFrame:
@@ -119,6 +160,32 @@ def predict_against_target(target: str, designs: List[str], test: bool = False,
     return df
 
 
+def predict_against_targets(targets: List[str], designs_list: List[List[str]], api_key: str = None) -> List[pd.DataFrame]:
+    """
+    Predict affinities for several targets concurrently.
+
+    Submission and polling are network-bound, so threads fit better than
+    processes here: HTTP waits release the GIL and nothing is pickled.
+    All jobs go through the pooled module-level Session, whose adapter
+    holds enough connections for every worker to keep one alive.
+
+    Args:
+        targets: One target sequence per job
+        designs_list: Design list for the matching target
+        api_key: API key for Synthyra API
+
+    Returns:
+        One result DataFrame per target, in input order
+    """
+    def _one(target, designs):
+        data = [{'SeqA': target, 'SeqB': design} for design in designs]
+        return send_request(data, 'ppi', api_key)
+
+    with ThreadPoolExecutor(max_workers=min(16, len(targets))) as executor:
+        futures = [executor.submit(_one, target, designs) for target, designs in zip(targets, designs_list)]
+        return [future.result() for future in futures]
+
+
 def predict_against_target_test(target: str, designs: List[str]) -> pd.DataFrame:
     """
     Generate random results in columns
@@ -1,69 +1,56 @@
-import os, csv
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 
 
 #################### Parse csv file
 
-with open('../extended_data/all_submissions.csv', 'r') as csvfile:
-	csv_lines = [line for line in csvfile]
+submissions_df = pd.read_csv('../extended_data/all_submissions.csv')
 
-csv_lines = csv_lines[1:]
+#Column positions match the old csv.reader indices: 0 id, 1 round, 3 selected, 7 method, 12 binding, 52 target_residue_list
+rounds = submissions_df.iloc[:, 1].to_numpy(dtype=np.int64)
+selected = submissions_df.iloc[:, 3].astype(str).to_numpy()
+method = submissions_df.iloc[:, 7].astype(str).to_numpy()
+binding = np.where(selected == 'No', 'Not tested', submissions_df.iloc[:, 12].astype(str).to_numpy())
 
-csv_lines = csv.reader(csv_lines, quotechar='"', delimiter=',', quoting=csv.QUOTE_ALL, skipinitialspace=True)
-csv_lines = [l for l in csv_lines]
 
+#Frequency arrays are kept here as each file is written so the diff step below works in memory instead of reparsing the files
+freq_cache = {}
 
-#From target_residue_list in all_submissions.csv
-def contacts_TF_list_from_csv_list(clist):
-	true_false_list = [True if (i + 1) in clist else False for i in range(621)] #True/False for all res in EGFR. True if it's in contact with binder design
-	return np.array(true_false_list)
-
-
-class Binder_csv:
-	def __init__(self, csvline):
-		self.csvline = csvline
-		self.id = csvline[0]
-		self.round = int(csvline[1])
-		self.selected = csvline[3]
-		if self.selected == 'No':
-			self.binding = 'Not tested'
-		else:
-			self.binding = csvline[12]
-		if len(csvline[52]) == 2:
-			self.target_res_list = []
-		else:
-			self.target_res_list = [int(i) for i in csvline[52][1:-1].split(', ')]
-		self.target_contacts = contacts_TF_list_from_csv_list(self.target_res_list)
-		self.method = csvline[7]
-
+idx_col = np.arange(1, 622, dtype = np.int32) #EGFR residue numbers are fixed, so build the index column once
 
 def contact_tf_matrix_to_chimera_file(tfmatrix, attrfile):
-	num_designs = len(tfmatrix)
-	tfmatrix = tfmatrix.sum(axis = 0)
-	full_contacts_sum_norm = tfmatrix / num_designs
+	full_contacts_sum_norm = tfmatrix.sum(axis = 0, dtype = np.float64) / len(tfmatrix)
+	freq_cache[attrfile] = full_contacts_sum_norm
 	header_lines = ['#\n', '#  Binder contact frequency to map onto EGFR\n', '#\n', '#  From Adaptyv Bio Protein Design Competition (all_submissions.csv)\n', '#\n', '#  Use this file to assign the attribute in Chimera with the\n', '#  Define Attribute tool or the command defattr.\n', '#\n', 'attribute: contactfreq\n', 'match mode: 1-to-1\n', 'recipient: residues\n']
-	data_lines = [f'	:{i + 1}	{full_contacts_sum_norm[i]}\n' for i in range(len(full_contacts_sum_norm))]
-	with open(attrfile, 'w') as outfile:
-		for line in header_lines:
-			outfile.write(line)
-		for line in data_lines:
-			outfile.write(line)
+	with open(attrfile, 'w', buffering = 1 << 20) as outfile: #large buffer + savetxt: one C-level loop instead of Python string building per line
+		outfile.write(''.join(header_lines))
+		np.savetxt(outfile, np.column_stack([idx_col, full_contacts_sum_norm]), fmt = ['	:%d', '	%.6g'], delimiter = '')
 
 
-binders = [Binder_csv(line) for line in csv_lines]
+#Build the (N, 621) contact True/False matrix in one shot from target_residue_list strings like '[12, 13, 14]'. True if res is in contact with binder design
+res_lists = submissions_df.iloc[:, 52].astype(str).str.slice(1, -1).str.split(', ').explode()
+res_lists = res_lists[res_lists != '']
+contacts_mat = np.zeros((len(submissions_df), 621), dtype=bool)
+contacts_mat[res_lists.index.to_numpy(), res_lists.to_numpy(dtype=np.int64) - 1] = True
 
 
+#Slice every subset with boolean masks instead of re-traversing the submission list per group
+successful_mask = np.isin(binding, ['Strong', 'Medium', 'Weak'])
+nonbinder_mask = (binding == 'None')
+optdiv_mask = np.isin(method, ['Optimized binder', 'Diversified binder'])
+denovohal_mask = np.isin(method, ['De novo', 'Hallucination'])
 
-all_submissions_contact_tf_matrix = np.array([b.target_contacts for b in binders])
 
-round1_submissions_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.round == 1])
+all_submissions_contact_tf_matrix = contacts_mat
 
-round2_submissions_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.round == 2])
+round1_submissions_contact_tf_matrix = contacts_mat[rounds == 1]
 
-successful_binders_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.binding in ['Strong', 'Medium', 'Weak']])
+round2_submissions_contact_tf_matrix = contacts_mat[rounds == 2]
 
-nonbinders_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.binding == 'None'])
+successful_binders_contact_tf_matrix = contacts_mat[successful_mask]
+
+nonbinders_contact_tf_matrix = contacts_mat[nonbinder_mask]
 
 
 print(f'All: {len(all_submissions_contact_tf_matrix)}')
@@ -86,27 +73,27 @@ contact_tf_matrix_to_chimera_file(nonbinders_contact_tf_matrix, 'contact_freq_fr
 
 #################### Split by design method:
 
-successful_binders_OPTDIV_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding in ['Strong', 'Medium', 'Weak']) and (b.method in ['Optimized binder', 'Diversified binder']))])
+successful_binders_OPTDIV_contact_tf_matrix = contacts_mat[successful_mask & optdiv_mask]
 
-nonbinders_OPTDIV_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding == 'None') and (b.method in ['Optimized binder', 'Diversified binder']))])
+nonbinders_OPTDIV_contact_tf_matrix = contacts_mat[nonbinder_mask & optdiv_mask]
 
 
-successful_binders_DENOVOHAL_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding in ['Strong', 'Medium', 'Weak']) and (b.method in ['De novo', 'Hallucination']))])
+successful_binders_DENOVOHAL_contact_tf_matrix = contacts_mat[successful_mask & denovohal_mask]
 
-nonbinders_DENOVOHAL_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding == 'None') and (b.method in ['De novo', 'Hallucination']))])
+nonbinders_DENOVOHAL_contact_tf_matrix = contacts_mat[nonbinder_mask & denovohal_mask]
 
 
-successful_binders_OTHER_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding in ['Strong', 'Medium', 'Weak']) and (b.method not in ['Optimized binder', 'Diversified binder', 'De novo', 'Hallucination']))])
+successful_binders_OTHER_contact_tf_matrix = contacts_mat[successful_mask & ~optdiv_mask & ~denovohal_mask]
 
-nonbinders_OTHER_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.binding == 'None') and (b.method not in ['Optimized binder', 'Diversified binder', 'De novo', 'Hallucination']))])
+nonbinders_OTHER_contact_tf_matrix = contacts_mat[nonbinder_mask & ~optdiv_mask & ~denovohal_mask]
 
 
-Unknown_contact_tf_matrix = np.array([b.target_contacts for b in binders if (b.binding == 'Unknown')])
+Unknown_contact_tf_matrix = contacts_mat[binding == 'Unknown']
 
 #Split by method, just designs where binding success/failure is known (i.e. they were expressed successfully):
-all_expressed_OPTDIV_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.method in ['Optimized binder', 'Diversified binder']) and (b.binding in ['Strong', 'Medium', 'Weak', 'None']))])
+all_expressed_OPTDIV_contact_tf_matrix = contacts_mat[optdiv_mask & (successful_mask | nonbinder_mask)]
 
-all_expressed_DENOVOHAL_contact_tf_matrix = np.array([b.target_contacts for b in binders if ((b.method in ['De novo', 'Hallucination']) and (b.binding in ['Strong', 'Medium', 'Weak', 'None']))])
+all_expressed_DENOVOHAL_contact_tf_matrix = contacts_mat[denovohal_mask & (successful_mask | nonbinder_mask)]
 
 
 print(f'All expressed OPTDIV: {len(all_expressed_OPTDIV_contact_tf_matrix)}')
@@ -137,95 +124,47 @@ contact_tf_matrix_to_chimera_file(all_expressed_DENOVOHAL_contact_tf_matrix, 'co
 #################### Contact freq difference (binders - non-binders):
 
 
-def parse_Chimera_file(chimerafile):
-	with open(chimerafile, 'r') as cfile:
-		datalines = [line for line in cfile]
-	datalines = datalines[11:]
-	res = [float(line.split()[0].strip(':')) for line in datalines]
-	cf = [float(line.split()[1].strip()) for line in datalines]
-	return res, cf
-
-
 def write_diff_file(chimerafile1, chimerafile2, output_chimera_attribute_file):
-	reslist, cf1 = parse_Chimera_file(chimerafile1)
-	_, cf2 = parse_Chimera_file(chimerafile2)
-	difflist = [(cf1[i] - cf2[i]) for i in range(len(cf1))]
+	#Diff the cached frequency arrays directly; the files just written above no longer need to be reparsed
+	difflist = freq_cache[chimerafile1] - freq_cache[chimerafile2]
 	header_lines = ['#\n', '#  Binder contact frequency difference to map onto EGFR\n', '#\n', '#  From Adaptyv Bio Protein Design Competition (all_submissions.csv)\n', '#\n', '#  Use this file to assign the attribute in Chimera with the\n', '#  Define Attribute tool or the command defattr.\n', '#\n', 'attribute: contactfreq\n', 'match mode: 1-to-1\n', 'recipient: residues\n']
-	data_lines = [f'	:{int(reslist[i])}	{difflist[i]}\n' for i in range(len(difflist))]
-	with open(output_chimera_attribute_file, 'w') as outfile:
-		for line in header_lines:
-			outfile.write(line)
-		for line in data_lines:
-			outfile.write(line)
+	with open(output_chimera_attribute_file, 'w', buffering = 1 << 20) as outfile:
+		outfile.write(''.join(header_lines))
+		np.savetxt(outfile, np.column_stack([idx_col, difflist]), fmt = ['	:%d', '	%.6g'], delimiter = '')
+	return difflist
 
 
-write_diff_file('contact_freq_from_csv_successful_binders_both_rounds.txt', 'contact_freq_from_csv_nonbinders_both_rounds.txt', 'contact_freq_diff_round1and2_binders_minus_nonbinders_from_csv.txt')
+cf_diff_csv = write_diff_file('contact_freq_from_csv_successful_binders_both_rounds.txt', 'contact_freq_from_csv_nonbinders_both_rounds.txt', 'contact_freq_diff_round1and2_binders_minus_nonbinders_from_csv.txt')
 
-write_diff_file('contact_freq_from_csv_successful_binders_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_from_csv_nonbinders_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_diff_from_csv_OPTIMIZED_DIVERSIFIED_binders_minus_nonbinders.txt')
+cf_diff_csv_optdiv = write_diff_file('contact_freq_from_csv_successful_binders_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_from_csv_nonbinders_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_diff_from_csv_OPTIMIZED_DIVERSIFIED_binders_minus_nonbinders.txt')
 
-write_diff_file('contact_freq_from_csv_successful_binders_DENOVO_HALLUCINATION.txt', 'contact_freq_from_csv_nonbinders_DENOVO_HALLUCINATION.txt', 'contact_freq_diff_from_csv_DENOVO_HALLUCINATION_binders_minus_nonbinders.txt')
+cf_diff_csv_denovohal = write_diff_file('contact_freq_from_csv_successful_binders_DENOVO_HALLUCINATION.txt', 'contact_freq_from_csv_nonbinders_DENOVO_HALLUCINATION.txt', 'contact_freq_diff_from_csv_DENOVO_HALLUCINATION_binders_minus_nonbinders.txt')
 
 #To see which contacts are enriched in optimized/diversified designs relative to de novo/hallucinated designs, among those where binding success/failure is known so we can use this to interpret the binders - non-binders plot
-write_diff_file('contact_freq_from_csv_all_expressed_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_from_csv_all_expressed_DENOVO_HALLUCINATION.txt', 'contact_freq_diff_from_csv_all_expressed_OPTDIV_minus_DENOVOHAL.txt')
-
-
-res, cf_diff_csv = parse_Chimera_file('contact_freq_diff_round1and2_binders_minus_nonbinders_from_csv.txt')
-
-_, cf_diff_csv_optdiv = parse_Chimera_file('contact_freq_diff_from_csv_OPTIMIZED_DIVERSIFIED_binders_minus_nonbinders.txt')
-
-_, cf_diff_csv_denovohal = parse_Chimera_file('contact_freq_diff_from_csv_DENOVO_HALLUCINATION_binders_minus_nonbinders.txt')
-
-_, cf_diff_csv_optdiv_vs_denovohal = parse_Chimera_file('contact_freq_diff_from_csv_all_expressed_OPTDIV_minus_DENOVOHAL.txt')
-
-
-fig, ax = plt.subplots(figsize=(9,3))
-ax.scatter(res, cf_diff_csv_denovohal, marker = 'o', s = 5.0, color = 'black')
-ax.axvspan(0.5, 165.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.axvspan(310.5, 480.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.set_title('Contact Frequency Difference (Binders - Non-Binders), De Novo/Hallucination', fontweight='bold')
-ax.set_xlabel('Residue')
-ax.set_ylabel('Difference')
-#ax.set_ylim(l, u)
-plt.subplots_adjust(bottom=0.15)
-plt.savefig('contact_freq_diff_plot_round1and2_DENOVO_HALLUCINATION_binders_minus_nonbinders_from_csv_no_epitope.png', format='png', dpi=600)
-
-l, u = plt.ylim()
-
-
-fig, ax = plt.subplots(figsize=(9,3))
-ax.scatter(res, cf_diff_csv_optdiv, marker = 'o', s = 5.0, color = 'black')
-ax.axvspan(0.5, 165.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.axvspan(310.5, 480.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.set_title('Contact Frequency Difference (Binders - Non-Binders), Optimized/Diversified', fontweight='bold')
-ax.set_xlabel('Residue')
-ax.set_ylabel('Difference')
-ax.set_ylim(l, u)
-plt.subplots_adjust(bottom=0.15)
-plt.savefig('contact_freq_diff_plot_round1and2_OPTIMIZED_DIVERSIFIED_binders_minus_nonbinders_from_csv_no_epitope.png', format='png', dpi=600)
-
-
-fig, ax = plt.subplots(figsize=(9,3))
-ax.scatter(res, cf_diff_csv, marker = 'o', s = 5.0, color = 'black')
-ax.axvspan(0.5, 165.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.axvspan(310.5, 480.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.set_title('Contact Frequency Difference (Binders - Non-Binders), All Methods', fontweight='bold')
-ax.set_xlabel('Residue')
-ax.set_ylabel('Difference')
-ax.set_ylim(l, u)
-plt.subplots_adjust(bottom=0.15)
-plt.savefig('contact_freq_diff_plot_round1and2_binders_minus_nonbinders_from_csv_no_epitope_ylim_matching_method_comparisons.png', format='png', dpi=600)
-
-
-fig, ax = plt.subplots(figsize=(9,3))
-ax.scatter(res, cf_diff_csv_optdiv_vs_denovohal, marker = 'o', s = 5.0, color = 'black')
-ax.axvspan(0.5, 165.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.axvspan(310.5, 480.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
-ax.set_title('Contact Frequency Difference (Optimized/Diversified - De Novo/Hallucination)', fontweight='bold')
-ax.set_xlabel('Residue')
-ax.set_ylabel('Difference')
-ax.set_ylim(l, u)
-plt.subplots_adjust(bottom=0.15)
-plt.savefig('contact_freq_diff_plot_round1and2_OPTDIV_minus_DENOVOHAL_all_expressed_from_csv_no_epitope.png', format='png', dpi=600)
+cf_diff_csv_optdiv_vs_denovohal = write_diff_file('contact_freq_from_csv_all_expressed_OPTIMIZED_DIVERSIFIED.txt', 'contact_freq_from_csv_all_expressed_DENOVO_HALLUCINATION.txt', 'contact_freq_diff_from_csv_all_expressed_OPTDIV_minus_DENOVOHAL.txt')
+
+
+res = np.arange(1, len(cf_diff_csv) + 1)
+
+
+#One figure with four shared-axis panels instead of four figures: the backend is set up once, the y-limits match by construction (the old version copied the first plot's limits onto the rest), and one dpi=600 save replaces four
+diff_panels = [
+	(cf_diff_csv_denovohal, 'Contact Frequency Difference (Binders - Non-Binders), De Novo/Hallucination'),
+	(cf_diff_csv_optdiv, 'Contact Frequency Difference (Binders - Non-Binders), Optimized/Diversified'),
+	(cf_diff_csv, 'Contact Frequency Difference (Binders - Non-Binders), All Methods'),
+	(cf_diff_csv_optdiv_vs_denovohal, 'Contact Frequency Difference (Optimized/Diversified - De Novo/Hallucination)'),
+]
+
+fig, axes = plt.subplots(4, 1, figsize=(9,12), sharex=True, sharey=True)
+for ax, (cf_diff, title) in zip(axes, diff_panels):
+	ax.scatter(res, cf_diff, marker = 'o', s = 5.0, color = 'black')
+	ax.axvspan(0.5, 165.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
+	ax.axvspan(310.5, 480.5, facecolor='#ebebeb', edgecolor = '#ffffff00', zorder = -10)
+	ax.set_title(title, fontweight='bold')
+	ax.set_ylabel('Difference')
+axes[-1].set_xlabel('Residue')
+plt.subplots_adjust(bottom=0.05, hspace=0.35)
+plt.savefig('contact_freq_diff_plots_round1and2_from_csv_no_epitope.png', format='png', dpi=600)
 
 
 
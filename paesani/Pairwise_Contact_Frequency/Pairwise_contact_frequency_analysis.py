@@ -1,63 +1,37 @@
-import os, csv
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 
 
 #################### Parse csv file
 
-with open('../../extended_data/all_submissions.csv', 'r') as csvfile:
-	csv_lines = [line for line in csvfile]
+submissions_df = pd.read_csv('../../extended_data/all_submissions.csv')
 
-csv_lines = csv_lines[1:]
+#Column positions match the old csv.reader indices: 3 selected, 12 binding, 52 target_residue_list
+selected = submissions_df.iloc[:, 3].astype(str).to_numpy()
+binding = np.where(selected == 'No', 'Not tested', submissions_df.iloc[:, 12].astype(str).to_numpy())
 
-csv_lines = csv.reader(csv_lines, quotechar='"', delimiter=',', quoting=csv.QUOTE_ALL, skipinitialspace=True)
-csv_lines = [l for l in csv_lines]
+#Build the (N, 621) contact True/False matrix in one shot from target_residue_list strings like '[12, 13, 14]'. True if res is in contact with binder design
+res_lists = submissions_df.iloc[:, 52].astype(str).str.slice(1, -1).str.split(', ').explode()
+res_lists = res_lists[res_lists != '']
+contacts_mat = np.zeros((len(submissions_df), 621), dtype=bool)
+contacts_mat[res_lists.index.to_numpy(), res_lists.to_numpy(dtype=np.int64) - 1] = True
 
 
-#From target_residue_list in all_submissions.csv
-def contacts_TF_list_from_csv_list(clist):
-	true_false_list = [True if (i + 1) in clist else False for i in range(621)] #True/False for all res in EGFR. True if it's in contact with binder design
-	return np.array(true_false_list)
-
-
-class Binder_csv:
-	def __init__(self, csvline):
-		self.csvline = csvline
-		self.id = csvline[0]
-		self.round = int(csvline[1])
-		self.selected = csvline[3]
-		if self.selected == 'No':
-			self.binding = 'Not tested'
-		else:
-			self.binding = csvline[12]
-		if len(csvline[52]) == 2:
-			self.target_res_list = []
-		else:
-			self.target_res_list = [int(i) for i in csvline[52][1:-1].split(', ')]
-		self.target_contacts = contacts_TF_list_from_csv_list(self.target_res_list)
-		self.method = csvline[7]
-
+idx_col = np.arange(1, 622, dtype = np.int32) #EGFR residue numbers are fixed, so build the index column once
 
 def contact_tf_matrix_to_chimera_file(tfmatrix, attrfile):
-	num_designs = len(tfmatrix)
-	tfmatrix = tfmatrix.sum(axis = 0)
-	full_contacts_sum_norm = tfmatrix / num_designs
+	full_contacts_sum_norm = tfmatrix.sum(axis = 0, dtype = np.float64) / len(tfmatrix)
 	header_lines = ['#\n', '#  Binder contact frequency to map onto EGFR\n', '#\n', '#  From Adaptyv Bio Protein Design Competition (all_submissions.csv)\n', '#\n', '#  Use this file to assign the attribute in Chimera with the\n', '#  Define Attribute tool or the command defattr.\n', '#\n', 'attribute: contactfreq\n', 'match mode: 1-to-1\n', 'recipient: residues\n']
-	data_lines = [f'	:{i + 1}	{full_contacts_sum_norm[i]}\n' for i in range(len(full_contacts_sum_norm))]
-	with open(attrfile, 'w') as outfile:
-		for line in header_lines:
-			outfile.write(line)
-		for line in data_lines:
-			outfile.write(line)
-
-
-binders = [Binder_csv(line) for line in csv_lines]
+	with open(attrfile, 'w', buffering = 1 << 20) as outfile: #large buffer + savetxt: one C-level loop instead of Python string building per line
+		outfile.write(''.join(header_lines))
+		np.savetxt(outfile, np.column_stack([idx_col, full_contacts_sum_norm]), fmt = ['	:%d', '	%.6g'], delimiter = '')
 
 
-successful_binders_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.binding in ['Strong', 'Medium', 'Weak']])
+successful_binders_contact_tf_matrix = contacts_mat[np.isin(binding, ['Strong', 'Medium', 'Weak'])]
 
-nonbinders_contact_tf_matrix = np.array([b.target_contacts for b in binders if b.binding == 'None'])
+nonbinders_contact_tf_matrix = contacts_mat[binding == 'None']
 
 
 
@@ -66,14 +40,28 @@ print(f'Non-binders: {len(nonbinders_contact_tf_matrix)}')
 
 
 #num structures with both target res i and j contacted out of total num structures in group
-def pairwise_cf(i, j, tfmatrix):
-	tfmatrix_ij_vector = [(row[i] and row[j]) for row in tfmatrix]
-	return np.sum(tfmatrix_ij_vector) / len(tfmatrix_ij_vector)
+def contact_tf_matrix_to_pairwise_contactfreq_matrix(tfmatrix):
+	contact_matrix = tfmatrix.astype(np.float32) #entry (i, j) of M^T M counts structures contacting both res i and j
+	return (contact_matrix.T @ contact_matrix) / contact_matrix.shape[0]
 
 
-def contact_tf_matrix_to_pairwise_contactfreq_matrix(tfmatrix):
-	pair_cf_matrix = [[pairwise_cf(i, j, tfmatrix) for j in range(len(tfmatrix[0]))] for i in range(len(tfmatrix[0]))]
-	return np.array(pair_cf_matrix)
+def popcount_uint64(words):
+	words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+	words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+	words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+	return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+#Memory-constrained alternative to the matmul above: pack each residue's design contacts into uint64 words, then count co-contacts with bitwise AND + popcount (64 designs per word instead of a float32 each). The matmul stays the default since it's faster when the full matrix fits in memory.
+def contact_tf_matrix_to_pairwise_contactfreq_matrix_bitpacked(tfmatrix):
+	num_designs = len(tfmatrix)
+	packed_bytes = np.packbits(tfmatrix.T, axis=1, bitorder='little')
+	if packed_bytes.shape[1] % 8 != 0: #pad byte columns to a whole number of uint64 words
+		padding = np.zeros((packed_bytes.shape[0], 8 - packed_bytes.shape[1] % 8), dtype=np.uint8)
+		packed_bytes = np.concatenate([packed_bytes, padding], axis=1)
+	packed_words = packed_bytes.view(np.uint64)
+	pair_counts = np.array([popcount_uint64(packed_words[i] & packed_words).sum(axis=1) for i in range(len(packed_words))])
+	return pair_counts / num_designs
 
 
 successful_binders_contact_pairwise_matrix = contact_tf_matrix_to_pairwise_contactfreq_matrix(successful_binders_contact_tf_matrix)